@@ -10,7 +10,6 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import plotly.express as px
-from PIL import Image
 import io
 
 # Page configuration
@@ -533,67 +532,115 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Cache data loading functions
-@st.cache_data
-def load_sward_descriptions():
-    """Load S-Ward descriptions and zone information"""
-    csv_path = Path('Data/SWard_description/swards.csv')
-    if not csv_path.exists():
-        return None
-    df = pd.read_csv(csv_path)
-    return df
+from src.data_loader import (
+    load_sward_descriptions,
+    load_stats_range,
+    load_zone_positions
+)
+from src.cache_dataset import POSITIONS_DATASET_DIR, positions_source_files
+from src.cache_manifest import get_manifest_dates, get_stats_dates
+from src.data_cache import DATA_CACHE
+from src.frame_renderer import DEFAULT_OUTPUT_WIDTH, FrameRenderer
+from src.map_raster import draw_map, get_map_raster, get_map_size, map_image_path
+from src.position_index import load_position_index
+from src.trajectory_trails import DEFAULT_TRAIL_SECONDS, TrailBuffer
+from src.frame_stream import FrameStream
+from src.playback_clock import PlaybackClock
+from src.spatial_query import CELL_SIZE, query_region, rectangle
+from src.heatmap_store import frame_span, heatmap_cumulative_max, heatmap_window, load_heatmap_store, period_window
+from src.heatmap_render import get_heatmap_png, heatmap_image_path, period_title
+from src.video_export import VIDEO_MIME, export_localization_video, get_cached_video
+from src.playback import FRAME_DURATION_MS, build_playback_payload, build_playback_figure, map_data_uri
 
-@st.cache_data
-def load_position_data(date_str):
-    """Load position cache data for a specific date"""
-    cache_file = Path('Data/Cache') / f'positions_{date_str}.parquet'
-    if not cache_file.exists():
+def load_map_image():
+    """Base map as a read-only RGB array (decoded once per process), or None if missing"""
+    if map_image_path() is None:
         return None
-    return pd.read_parquet(cache_file)
+    return get_map_raster()
 
-@st.cache_data
-def load_stats_data(date_str):
-    """Load statistics cache data for a specific date"""
-    cache_file = Path('Data/Cache') / f'stats_timeseries_{date_str}.parquet'
-    if not cache_file.exists():
-        return None
-    return pd.read_parquet(cache_file)
+@st.cache_resource
+def load_frame_renderer():
+    """Localization frame renderer (shared pre-scaled map raster, shared across sessions)"""
+    return FrameRenderer(get_map_raster(DEFAULT_OUTPUT_WIDTH), map_size=get_map_size())
 
-@st.cache_data
-def load_heatmap_data(date_str):
-    """Load heatmap cache data for a specific date"""
-    cache_file = Path('Data/Cache') / f'heatmap_cumulative_{date_str}.npz'
-    if not cache_file.exists():
+@st.cache_resource(max_entries=8)
+def load_playback_figure(date_str, start_time_idx, end_time_idx, frame_step, frame_duration_ms):
+    """Client-side playback figure for a time window (built once per window/speed)"""
+    position_index = load_position_index(date_str)
+    if position_index is None:
         return None
-    data = np.load(cache_file)
-    return {
-        'cumulative_heatmaps': data['cumulative_heatmaps'],
-        'time_indices': data['time_indices']
-    }
+    payload = build_playback_payload(position_index, start_time_idx, end_time_idx)
+    if len(payload['time_index']) == 0:
+        return None
+    renderer = load_frame_renderer()
+    map_uri = map_data_uri(renderer.encode(renderer.base))
+    return build_playback_figure(
+        payload,
+        map_uri,
+        get_map_size(),
+        frame_step=frame_step,
+        frame_duration_ms=frame_duration_ms
+    )
 
-@st.cache_data
-def load_map_image():
-    """Load base map image"""
-    map_path = Path('Data/Map/map_image.png')
-    if not map_path.exists():
-        # Try alternative name
-        map_path = Path('Data/Map/map.png')
-        if not map_path.exists():
-            return None
-    return Image.open(map_path)
+@st.cache_resource
+def load_region_select_figure():
+    """Map figure for drawing a query region (box / lasso select over a transparent cell grid)"""
+    renderer = load_frame_renderer()
+    width, height = get_map_size()
+    # Selection needs selectable points; one invisible point per grid cell
+    grid_x, grid_y = np.meshgrid(
+        np.arange(CELL_SIZE / 2, width, CELL_SIZE), np.arange(CELL_SIZE / 2, height, CELL_SIZE)
+    )
+    fig = go.Figure(go.Scatter(
+        x=grid_x.ravel(), y=grid_y.ravel(), mode='markers',
+        marker=dict(size=4, opacity=0), hoverinfo='skip', showlegend=False
+    ))
+    fig.update_layout(
+        images=[dict(
+            source=map_data_uri(renderer.encode(renderer.base)), xref='x', yref='y', x=0, y=0,
+            sizex=width, sizey=height, sizing='stretch', layer='below'
+        )],
+        xaxis=dict(range=[0, width], visible=False, constrain='domain'),
+        yaxis=dict(range=[height, 0], visible=False, scaleanchor='x'),
+        template="plotly_white",
+        height=500,
+        margin=dict(l=0, r=0, t=0, b=0),
+        dragmode='select'
+    )
+    return fig
+
+def selected_region(event):
+    """Plotly selection event -> polygon [(x, y), ...] in map pixels (last box or lasso), or None"""
+    selection = event.selection if event is not None else None
+    if not selection:
+        return None
+    for lasso in reversed(selection.get('lasso') or []):
+        if len(lasso.get('x', [])) >= 3:
+            return list(zip(lasso['x'], lasso['y']))
+    for box in reversed(selection.get('box') or []):
+        if len(box.get('x', [])) == 2 and len(box.get('y', [])) == 2:
+            return rectangle(box['x'][0], box['y'][0], box['x'][1], box['y'][1])
+    return None
 
 def get_available_dates():
     """Get list of available dates from cache files or weather data"""
+    # Method 0: Cache manifest (memoized, no filesystem scan on hot reruns)
+    manifest_dates = get_manifest_dates()
+    if manifest_dates:
+        return manifest_dates
+    
     # Method 1: Try positions cache (for full functionality)
     cache_dir = Path('Data/Cache')
     if cache_dir.exists():
         position_files = list(cache_dir.glob('positions_*.parquet'))
-        if position_files:
-            dates = []
-            for f in position_files:
-                date_str = f.stem.replace('positions_', '')
+        position_dirs = list(POSITIONS_DATASET_DIR.glob('date=*'))
+        if position_files or position_dirs:
+            dates = set()
+            for f in position_files + position_dirs:
+                date_str = f.stem.replace('positions_', '') if f.is_file() else f.name.replace('date=', '')
                 # Validate date format (YYYY-MM-DD only, exclude test files)
                 if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
-                    dates.append(date_str)
+                    dates.add(date_str)
             return sorted(dates, reverse=True)
     
     # Method 2: Use weather data for date list (for deployment without positions)
@@ -632,18 +679,12 @@ def get_available_dates():
     
     return []
 
-def time_index_to_time(time_index):
-    """Convert time_index to HH:MM format"""
-    seconds = (time_index - 1) * 10
-    hours = seconds // 3600
-    minutes = (seconds % 3600) // 60
-    return f"{hours:02d}:{minutes:02d}"
-
-def time_to_time_index(time_str):
-    """Convert HH:MM to time_index"""
-    hours, minutes = map(int, time_str.split(':'))
-    seconds = hours * 3600 + minutes * 60
-    return (seconds // 10) + 1
+from src.time_axis import (
+    time_index_to_time,
+    minutes_to_time_index,
+    time_index_to_labels,
+    time_index_to_hour_decimal
+)
 
 def create_zone_mapping(sward_df):
     """Create mapping from S-Ward to Zone"""
@@ -707,7 +748,8 @@ def render_sidebar():
             "📍 Localization",
             "🔥 Heatmap Analysis",
             "🌐 Spatial Flow",
-            "🔮 Flow Prediction"
+            "🔮 Flow Prediction",
+            "🩺 Diagnostics"
         ]
         
         selected_menu = st.radio(
@@ -722,6 +764,9 @@ def render_sidebar():
 # TRAFFIC ANALYSIS
 # =====================================================
 
+from src.traffic_engine import compute_cumulative_visitors, compute_zone_visits, compute_os_traffic, VISIT_GAP_MINUTES
+from src.traffic_cube import load_traffic_cube, get_total_traffic, get_zone_traffic
+
 def render_traffic_analysis(date_str):
     """Render traffic analysis page"""
     st.title("🚶 Traffic Analysis")
@@ -729,27 +774,25 @@ def render_traffic_analysis(date_str):
     st.markdown("---")
     
     # Load data
-    stats_df = load_stats_data(date_str)
-    positions_df = load_position_data(date_str)
+    traffic_cube = load_traffic_cube(date_str)
+    positions_df = load_zone_positions(date_str)
     sward_df = load_sward_descriptions()
     
-    if stats_df is None or positions_df is None or sward_df is None:
+    if traffic_cube is None or positions_df is None or sward_df is None:
         st.error("Data not available for selected date")
         return
     
-    # Create zone mapping
+    # Create zone mapping (positions_df already carries a categorical 'zone' column)
     zone_mapping, zone_swards = create_zone_mapping(sward_df)
     
-    # Add zone to positions
-    positions_df['zone'] = positions_df['sward_name'].map(zone_mapping)
-    
     # Section 1: Total Traffic
     st.header("1️⃣ Total Traffic Over Time")
     
-    # Aggregate by time (1-minute intervals)
-    total_traffic = stats_df.groupby('time_index')['total_devices'].first().reset_index()
-    total_traffic['time'] = total_traffic['time_index'].apply(time_index_to_time)
-    total_traffic['hour_decimal'] = total_traffic['time_index'].apply(lambda x: ((x-1) * 10) / 3600)
+    # Total traffic row of the per-date zone × time cube
+    total_time_index, total_devices = get_total_traffic(traffic_cube)
+    total_traffic = pd.DataFrame({'time_index': total_time_index, 'total_devices': total_devices})
+    total_traffic['time'] = time_index_to_labels(total_time_index)
+    total_traffic['hour_decimal'] = time_index_to_hour_decimal(total_time_index)
     
     fig_total = go.Figure()
     fig_total.add_trace(go.Scatter(
@@ -774,6 +817,72 @@ def render_traffic_analysis(date_str):
     
     st.plotly_chart(fig_total, use_container_width=True)
     
+    # Device OS breakdown (precomputed is_randomized_ios column)
+    with st.expander("📱 Devices by OS (iOS / Android)"):
+        os_traffic = compute_os_traffic(positions_df, bin_minutes=1)
+        fig_os = go.Figure()
+        for column, name, color in (('ios', 'iOS', '#3b82f6'), ('android', 'Android', '#ef4444')):
+            fig_os.add_trace(go.Scatter(
+                x=os_traffic['hour_decimal'],
+                y=os_traffic[column],
+                mode='lines',
+                name=name,
+                stackgroup='os',
+                line=dict(color=color, width=1),
+                hovertemplate='<b>Time:</b> %{text}<br><b>' + name + ':</b> %{y}<extra></extra>',
+                text=os_traffic['time']
+            ))
+        fig_os.update_layout(
+            xaxis_title="Hour of Day",
+            yaxis_title="Unique Devices (1-min)",
+            xaxis=dict(range=[0, 24], dtick=1),
+            template="plotly_white",
+            height=350,
+            hovermode='x unified'
+        )
+        st.plotly_chart(fig_os, use_container_width=True)
+    
+    # Multi-day view: all dates in the range are read in one parallel pass
+    with st.expander("📅 Multi-day Comparison"):
+        range_dates = get_stats_dates()
+        if len(range_dates) < 2:
+            st.info("At least two dates are needed for a multi-day comparison")
+        else:
+            end_pos = range_dates.index(date_str) if date_str in range_dates else len(range_dates) - 1
+            range_start, range_end = st.select_slider(
+                "Date range",
+                options=range_dates,
+                value=(range_dates[max(end_pos - 6, 0)], range_dates[end_pos]),
+                key="traffic_date_range"
+            )
+            range_stats = load_stats_range(range_start, range_end)
+            if range_stats is None:
+                st.info("No statistics cache in selected range")
+            else:
+                # total_devices is the store-wide count per slot (repeated on every S-Ward row)
+                slot_totals = range_stats.groupby(['date', 'time_index'], observed=True)['total_devices'].first()
+                daily = slot_totals.groupby(level='date', observed=True).agg(['max', 'mean']).reset_index()
+                fig_daily = go.Figure()
+                fig_daily.add_trace(go.Bar(x=daily['date'], y=daily['max'], name='Peak Devices', marker_color='#3b82f6'))
+                fig_daily.add_trace(go.Bar(x=daily['date'], y=daily['mean'].round(1), name='Average Devices', marker_color='#93c5fd'))
+                fig_daily.update_layout(
+                    xaxis_title="Date",
+                    yaxis_title="Number of Devices",
+                    barmode='group',
+                    template="plotly_white",
+                    height=350
+                )
+                st.plotly_chart(fig_daily, use_container_width=True)
+                
+                report = range_stats.attrs['load_report']
+                caption = (
+                    f"Loaded {len(report['dates'])} days · {report['rows']:,} rows in {report['seconds']:.2f} s "
+                    f"({report['mb_per_s']:.0f} MB/s)"
+                )
+                if report['missing_dates']:
+                    caption += f" · no cache for {', '.join(report['missing_dates'])}"
+                st.caption(caption)
+    
     # Section 2: Zone Traffic
     st.header("2️⃣ Zone-Specific Traffic")
     
@@ -794,12 +903,11 @@ def render_traffic_analysis(date_str):
         zone_traffic_data = []
         
         for zone in selected_zones:
-            swards_in_zone = zone_swards[zone]
-            zone_stats = stats_df[stats_df['sward_name'].isin(swards_in_zone)]
-            zone_traffic = zone_stats.groupby('time_index')['count'].sum().reset_index()
+            zone_time_index, zone_count = get_zone_traffic(traffic_cube, [zone])
+            zone_traffic = pd.DataFrame({'time_index': zone_time_index, 'count': zone_count})
             zone_traffic['zone'] = zone
-            zone_traffic['hour_decimal'] = zone_traffic['time_index'].apply(lambda x: ((x-1) * 10) / 3600)
-            zone_traffic['time'] = zone_traffic['time_index'].apply(time_index_to_time)
+            zone_traffic['hour_decimal'] = time_index_to_hour_decimal(zone_time_index)
+            zone_traffic['time'] = time_index_to_labels(zone_time_index)
             zone_traffic_data.append(zone_traffic)
         
         if zone_traffic_data:
@@ -867,37 +975,17 @@ def render_traffic_analysis(date_str):
     
     if len(zone_positions) == 0:
         st.warning(f"No data found for zones: {selected_zones_cum}")
-        cumulative_hourly = pd.DataFrame({'hour': range(24), 'cumulative_visitors': [0] * 24})
-    else:
-        # Group by MAC and calculate dwell time
-        mac_dwell = zone_positions.groupby('mac_address').agg({
-            'time_index': ['min', 'max', 'count']
-        }).reset_index()
-        mac_dwell.columns = ['mac_address', 'first_seen', 'last_seen', 'count']
-        mac_dwell['dwell_minutes'] = (mac_dwell['last_seen'] - mac_dwell['first_seen']) * 10 / 60
-        
-        # Filter by dwell time
-        qualified_macs = mac_dwell[mac_dwell['dwell_minutes'] >= dwell_time]['mac_address'].unique()
-        
-        if len(qualified_macs) == 0:
-            cumulative_hourly = pd.DataFrame({'hour': range(24), 'cumulative_visitors': [0] * 24})
-        else:
-            # Calculate cumulative count over time
-            cumulative_data = []
-            seen_macs = set()
-            
-            for time_idx in sorted(zone_positions['time_index'].unique()):
-                # Get MACs at this time
-                current_macs = set(zone_positions[zone_positions['time_index'] == time_idx]['mac_address'].unique())
-                # Add to seen set
-                seen_macs.update(current_macs)
-                # Count qualified MACs
-                qualified_count = len(seen_macs & set(qualified_macs))
-                hour_decimal = ((time_idx - 1) * 10) / 3600
-                time_str = time_index_to_time(time_idx)
-                cumulative_data.append({'time_index': time_idx, 'hour_decimal': hour_decimal, 'time': time_str, 'cumulative_visitors': qualified_count})
-            
-            cumulative_df = pd.DataFrame(cumulative_data)
+    
+    # Split each MAC's presence into visits (re-entries after a gap count separately)
+    zone_visits = compute_zone_visits(zone_positions, gap_minutes=VISIT_GAP_MINUTES)
+    
+    # Filter by dwell time (per visit)
+    qualified_visits = zone_visits[zone_visits['dwell_minutes'] >= dwell_time]
+    visitor_first_seen = qualified_visits.groupby('mac_address', observed=True)['start'].min()
+    qualified_macs = visitor_first_seen.index
+    
+    # Calculate cumulative count over time (each visitor counted at its first qualifying visit)
+    cumulative_df = compute_cumulative_visitors(zone_positions, qualified_macs, first_seen=visitor_first_seen)
     
     fig_cum = go.Figure()
     fig_cum.add_trace(go.Scatter(
@@ -932,8 +1020,8 @@ def render_traffic_analysis(date_str):
             st.metric("Total Qualified Visitors", 0)
     with col2:
         if len(zone_positions) > 0 and len(qualified_macs) > 0:
-            avg_dwell = mac_dwell[mac_dwell['mac_address'].isin(qualified_macs)]['dwell_minutes'].mean()
-            st.metric("Avg Dwell Time", f"{avg_dwell:.1f} min")
+            avg_dwell = qualified_visits['dwell_minutes'].mean()
+            st.metric("Avg Dwell Time", f"{avg_dwell:.1f} min", help=f"Per visit ({len(qualified_visits)} qualified visits)")
         else:
             st.metric("Avg Dwell Time", "0.0 min")
     with col3:
@@ -949,17 +1037,14 @@ def render_localization(date_str):
     st.markdown(f"<p style='color: #4b5563;'><strong>Date:</strong> {datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')}</p>", unsafe_allow_html=True)
     st.markdown("---")
     
-    # Load position data
-    positions_df = load_position_data(date_str)
-    if positions_df is None:
+    # Position data is read per time window below (partitioned dataset)
+    if not positions_source_files(date_str):
         st.error("No position data available for this date")
         return
     
-    # Load map
-    map_img = load_map_image()
-    if map_img is None:
+    # Map raster is shared (decoded once); warn if only the white fallback is available
+    if map_image_path() is None:
         st.warning("Map image not found")
-        map_img = Image.new('RGB', (696, 509), color='white')
     
     # Time selection using sliders
     st.subheader("⏰ Time Range")
@@ -998,13 +1083,90 @@ def render_localization(date_str):
         end_minute = end_minutes % 60
         st.markdown(f"<h2 style='text-align: center; color: #1f2937; margin-top: 5px;'>⏰ {end_hour:02d}:{end_minute:02d}</h2>", unsafe_allow_html=True)
     
-    start_time_idx = (start_hour * 3600 + start_minute * 60) // 10 + 1
-    end_time_idx = (end_hour * 3600 + end_minute * 60) // 10 + 1
+    start_time_idx = minutes_to_time_index(start_minutes)
+    end_time_idx = minutes_to_time_index(end_minutes)
     
     if start_time_idx >= end_time_idx:
         st.error("End time must be after start time")
         return
     
+    # Region query: draw a box / lasso on the map, count devices inside over the selected time range
+    with st.expander("📐 Region Query (draw a box or lasso on the map)"):
+        region_event = st.plotly_chart(
+            load_region_select_figure(),
+            use_container_width=True,
+            on_select="rerun",
+            selection_mode=("box", "lasso"),
+            key="loc_region_select"
+        )
+        region = selected_region(region_event)
+        if region is None:
+            st.info("💡 Use the box or lasso tool on the map to select a region.")
+        else:
+            result = query_region(date_str, region, start_time_idx, end_time_idx)
+            if result is None:
+                st.warning("No position data for this date")
+            else:
+                col_a, col_b, col_c = st.columns(3)
+                col_a.metric("Unique Devices", f"{result['devices']:,}")
+                col_b.metric("Observations", f"{result['observations']:,}")
+                col_c.metric("Peak Devices (10s)", f"{int(result['counts'].max()) if len(result['counts']) else 0:,}")
+                if len(result['time_index']) > 0:
+                    region_fig = go.Figure(go.Scatter(
+                        x=time_index_to_labels(result['time_index']),
+                        y=result['counts'],
+                        mode='lines',
+                        line=dict(color='#3b82f6', width=1.5),
+                        name='Devices'
+                    ))
+                    region_fig.update_layout(
+                        template="plotly_white",
+                        height=250,
+                        margin=dict(l=0, r=0, t=10, b=0),
+                        yaxis_title="Devices in region"
+                    )
+                    st.plotly_chart(region_fig, use_container_width=True)
+    
+    # Browser mode: ship the window once, animate client-side (no rerun per frame)
+    playback_mode = st.radio(
+        "Playback",
+        ["Server", "Browser", "Video"],
+        horizontal=True,
+        key="loc_playback_mode",
+        help="Browser mode sends the whole time range once and plays it in the browser. "
+             "Video mode plays a pre-rendered WebM cached under Data/Cache/Video."
+    )
+    if playback_mode == "Video":
+        speed = st.select_slider("Speed", options=["1x", "2x", "4x", "8x", "16x"], value="2x", key="loc_video_speed")
+        frame_step = int(speed.rstrip('x'))
+        video_file = get_cached_video(date_str, start_time_idx, end_time_idx, frame_step=frame_step)
+        if video_file is None and st.button("🎬 Render video", key="loc_render_video"):
+            with st.spinner("Rendering video..."):
+                result = export_localization_video(date_str, start_time_idx, end_time_idx, frame_step=frame_step)
+            if result is None:
+                st.warning("No position data in selected time range")
+                return
+            st.success(f"✅ Rendered {result['frames']} frames in {result['seconds']:.1f} s")
+            video_file = result['path']
+        if video_file is not None:
+            st.video(str(video_file), format=VIDEO_MIME['webm'])
+        else:
+            st.info("💡 No cached video for this range yet. Rendering runs once; later views play instantly.")
+        return
+    if playback_mode == "Browser":
+        speed = st.select_slider("Speed", options=["0.5x", "1x", "2x", "4x", "8x", "16x"], value="2x", key="loc_browser_speed")
+        speed_value = {"0.5x": 0.5, "1x": 1, "2x": 2, "4x": 4, "8x": 8, "16x": 16}[speed]
+        playback_fig = load_playback_figure(
+            date_str, start_time_idx, end_time_idx,
+            frame_step=max(int(speed_value), 1),
+            frame_duration_ms=int(FRAME_DURATION_MS / min(speed_value, 1))
+        )
+        if playback_fig is None:
+            st.warning("No position data in selected time range")
+            return
+        st.plotly_chart(playback_fig, use_container_width=True)
+        return
+    
     # Playback controls
     col1, col2, col3, col4 = st.columns([1, 1, 1, 2])
     with col1:
@@ -1016,100 +1178,108 @@ def render_localization(date_str):
     with col4:
         speed = st.select_slider("Speed", options=["0.5x", "1x", "2x", "4x", "8x", "16x"], value="2x", key="loc_speed")
     
-    # Initialize session state
-    if 'loc_playing' not in st.session_state:
-        st.session_state.loc_playing = False
-        st.session_state.loc_current_idx = 0
+    # Trajectory trails: last N seconds per device, accumulated incrementally while playing
+    col_trail, col_trail_len = st.columns([1, 3])
+    with col_trail:
+        show_trails = st.checkbox("🧭 Trails", value=False, key="loc_show_trails")
+    with col_trail_len:
+        trail_seconds = st.select_slider(
+            "Trail length", options=[30, 60, 120, 300, 600], value=DEFAULT_TRAIL_SECONDS,
+            format_func=lambda s: f"{s // 60} min" if s >= 60 else f"{s} s",
+            key="loc_trail_seconds", disabled=not show_trails
+        )
     
-    if play_button:
-        st.session_state.loc_playing = True
-    if pause_button:
-        st.session_state.loc_playing = False
-    if reset_button:
-        st.session_state.loc_current_idx = 0
-        st.session_state.loc_playing = False
+    # Frame stream: reads parquet row groups lazily as playback advances (memory bounded by one row group)
+    stream_key = (date_str, start_time_idx, end_time_idx)
+    if st.session_state.get('loc_stream_key') != stream_key:
+        st.session_state.loc_stream_key = stream_key
+        st.session_state.loc_frame_stream = FrameStream(date_str, start_time_idx, end_time_idx)
+    frame_stream = st.session_state.loc_frame_stream
     
-    # Filter data by time range
-    filtered_positions = positions_df[(positions_df['time_index'] >= start_time_idx) & 
-                                     (positions_df['time_index'] <= end_time_idx)].copy()
+    # Get time indices with data in the selected range
+    time_indices = frame_stream.frame_times
     
-    if len(filtered_positions) == 0:
+    if len(time_indices) == 0:
         st.warning("No position data in selected time range")
         return
     
-    # Get unique time indices
-    time_indices = sorted(filtered_positions['time_index'].unique())
-    
-    # Speed mapping
+    # Wall-clock playback: position follows elapsed time, not the number of reruns
     speed_map = {"0.5x": 0.5, "1x": 1, "2x": 2, "4x": 4, "8x": 8, "16x": 16}
-    frame_skip = int(speed_map[speed])
-    
-    # Auto-play logic
-    if st.session_state.loc_playing:
-        st.session_state.loc_current_idx += frame_skip
-        if st.session_state.loc_current_idx >= len(time_indices):
-            st.session_state.loc_current_idx = len(time_indices) - 1
-            st.session_state.loc_playing = False
-    
-    current_time_idx = time_indices[min(st.session_state.loc_current_idx, len(time_indices) - 1)]
-    current_positions = filtered_positions[filtered_positions['time_index'] == current_time_idx]
-    
-    # Count devices by type
-    ios_count = len(current_positions[current_positions['mac_address'].str.startswith(('02:', '06:', '0A:', '0E:'))])
-    android_count = len(current_positions) - ios_count
-    total_count = len(current_positions)
+    if st.session_state.get('loc_clock_key') != stream_key:
+        st.session_state.loc_clock_key = stream_key
+        st.session_state.loc_clock = PlaybackClock(len(time_indices))
+        st.session_state.loc_seek_frame = 1
+    clock = st.session_state.loc_clock
+    clock.set_speed(speed_map[speed])
     
-    # Create visualization
-    import matplotlib.pyplot as plt
-    import matplotlib.patches as patches
-    
-    fig, ax = plt.subplots(figsize=(14, 10), dpi=80)
-    ax.imshow(map_img)
+    if play_button:
+        clock.play()
+    if pause_button:
+        clock.pause()
+    if reset_button:
+        clock.reset()
+        st.session_state.loc_seek_frame = 1
+    
+    # Seek: jumps the clock only when the user moves the slider (playback itself doesn't move it)
+    if len(time_indices) > 1:
+        st.slider(
+            "Seek (frame)",
+            min_value=1,
+            max_value=len(time_indices),
+            step=1,
+            key="loc_seek_frame",
+            on_change=lambda: st.session_state.loc_clock.seek(st.session_state.loc_seek_frame - 1)
+        )
     
-    # Plot positions - separate iOS and Android
-    if len(current_positions) > 0:
-        ios_positions = current_positions[current_positions['mac_address'].str.startswith(('02:', '06:', '0A:', '0E:'))]
-        android_positions = current_positions[~current_positions['mac_address'].str.startswith(('02:', '06:', '0A:', '0E:'))]
+    renderer = load_frame_renderer()
+    
+    # Only this fragment refreshes on the clock; the rest of the page is not re-run per frame
+    @st.fragment(run_every=clock.refresh_interval if clock.playing else None)
+    def localization_player():
+        frame_idx = clock.current_frame()
+        current_time_idx = int(time_indices[frame_idx])
+        current_positions = frame_stream.frame(current_time_idx)
+        
+        # Trail ring buffer lives in the session; only frames passed since the last refresh are added
+        trails = None
+        if show_trails:
+            trail_key = (date_str, start_time_idx, end_time_idx, trail_seconds)
+            if st.session_state.get('loc_trail_key') != trail_key:
+                st.session_state.loc_trail_key = trail_key
+                # Trails need MAC codes, so they use the per-date frame index (buffer sized to the window's devices)
+                st.session_state.loc_trail_buffer = TrailBuffer(
+                    load_position_index(date_str), trail_seconds, start_time_idx, end_time_idx
+                )
+            trail_buffer = st.session_state.loc_trail_buffer
+            trail_buffer.advance(current_time_idx)
+            trails = trail_buffer.segments()
+        
+        # Render frame (pre-resized map + dot sprites, JPEG encoded)
+        frame = renderer.encode(renderer.render_positions(current_positions, current_time_idx, trails=trails))
+        
+        # Display using st.image (no flickering)
+        st.image(frame, use_container_width=True)
+        if clock.playing:
+            clock.mark_shown(frame_idx)
+        
+        # Progress bar
+        st.progress(frame_idx / max(len(time_indices) - 1, 1))
+        caption = f"Frame {frame_idx + 1} / {len(time_indices)}"
+        if clock.playing:
+            stats = clock.stats()
+            caption += (
+                f" · {stats['achieved_fps']:.1f} / {stats['target_fps']:g} fps"
+                f" · {stats['frames_dropped']} frames skipped"
+            )
+        st.caption(caption)
         
-        if len(ios_positions) > 0:
-            ax.scatter(ios_positions['x'], ios_positions['y'], 
-                      c='#3b82f6', s=50, alpha=0.7, edgecolors='white', linewidths=1, label='iOS')
-        if len(android_positions) > 0:
-            ax.scatter(android_positions['x'], android_positions['y'], 
-                      c='#ef4444', s=50, alpha=0.7, edgecolors='white', linewidths=1, label='Android')
+        # Reached the end: full rerun so the fragment stops its timer
+        if not clock.playing and st.session_state.get('loc_player_running'):
+            st.session_state.loc_player_running = False
+            st.rerun()
     
-    # Add time text (top-left)
-    current_time_str = time_index_to_time(current_time_idx)
-    ax.text(10, 30, current_time_str, fontsize=24, color='white', 
-           bbox=dict(boxstyle='round', facecolor='black', alpha=0.7), weight='bold')
-    
-    # Add device count (top-right)
-    count_text = f"iOS {ios_count} / Android {android_count} / Total {total_count}"
-    ax.text(686, 30, count_text, fontsize=18, color='white', ha='right',
-           bbox=dict(boxstyle='round', facecolor='black', alpha=0.7), weight='bold')
-    
-    ax.axis('off')
-    plt.tight_layout(pad=0)
-    
-    # Convert to image buffer to prevent flickering
-    buf = io.BytesIO()
-    fig.savefig(buf, format='png', bbox_inches='tight', pad_inches=0)
-    buf.seek(0)
-    plt.close(fig)
-    
-    # Display using st.image (no flickering)
-    st.image(buf, use_container_width=True)
-    
-    # Progress bar
-    progress = st.session_state.loc_current_idx / max(len(time_indices) - 1, 1)
-    st.progress(progress)
-    st.caption(f"Frame {st.session_state.loc_current_idx + 1} / {len(time_indices)}")
-    
-    # Auto-refresh if playing
-    if st.session_state.loc_playing:
-        import time
-        time.sleep(0.1)
-        st.rerun()
+    st.session_state.loc_player_running = clock.playing
+    localization_player()
 
 # =====================================================
 # HEATMAP ANALYSIS
@@ -1121,22 +1291,28 @@ def render_heatmap_analysis(date_str):
     st.markdown(f"<p style='color: #4b5563;'><strong>Date:</strong> {datetime.strptime(date_str, '%Y-%m-%d').strftime('%B %d, %Y')}</p>", unsafe_allow_html=True)
     st.markdown("---")
     
-    # Only static image mode for deployment (video mode removed to save 7GB)
-    render_heatmap_static(date_str)
+    # Video mode reads the delta-encoded store (MBs instead of the ~7GB dense stacks)
+    heatmap_mode = st.radio(
+        "Mode",
+        ["Static Image", "Animated Video"],
+        horizontal=True,
+        key="hm_mode"
+    )
+    if heatmap_mode == "Animated Video":
+        render_heatmap_video(date_str)
+    else:
+        render_heatmap_static(date_str)
 
 
 def render_heatmap_static(date_str):
     """Render static heatmap images (lightweight for deployment)"""
     st.markdown("---")
     
-    # Check for pre-generated heatmap images
-    heatmap_image_dir = Path('Data/Cache/Heatmap')
-    
     # Time period selection
     st.subheader("⏰ Time Period")
     time_period = st.selectbox(
         "Select time period",
-        ["Full Day (06:00 - 22:00)", "Morning (06:00 - 12:00)", "Afternoon (12:00 - 18:00)", "Evening (18:00 - 22:00)"],
+        ["Full Day (06:00 - 22:00)", "Morning (06:00 - 12:00)", "Afternoon (12:00 - 18:00)", "Evening (18:00 - 22:00)", "Custom Range"],
         label_visibility="collapsed"
     )
     
@@ -1144,108 +1320,54 @@ def render_heatmap_static(date_str):
         "Full Day (06:00 - 22:00)": "full",
         "Morning (06:00 - 12:00)": "morning",
         "Afternoon (12:00 - 18:00)": "afternoon",
-        "Evening (18:00 - 22:00)": "evening"
+        "Evening (18:00 - 22:00)": "evening",
+        "Custom Range": None
     }
     period_key = period_map[time_period]
     
-    # Look for cached heatmap image
-    image_path = heatmap_image_dir / f"heatmap_{date_str}_{period_key}.png"
+    if period_key is None:
+        custom_start, custom_end = st.slider(
+            "Custom range",
+            min_value=0,
+            max_value=1440,
+            value=(540, 600),
+            step=10,
+            format="%d min",
+            key="hm_custom_range"
+        )
+        if custom_start >= custom_end:
+            st.error("End time must be after start time")
+            return
+        start_label = f"{custom_start // 60:02d}:{custom_start % 60:02d}"
+        end_label = f"{custom_end // 60:02d}:{custom_end % 60:02d}"
+        st.caption(f"⏰ {start_label} - {end_label}")
+        start_idx, end_idx = minutes_to_time_index(custom_start), minutes_to_time_index(custom_end) - 1
+        image_title = f"Custom: {start_label} - {end_label}"
+        image_path = None
+    else:
+        start_idx, end_idx = period_window(period_key)
+        image_title = period_title(period_key)
+        # Look for pre-generated heatmap image (python -m src.heatmap_render)
+        image_path = heatmap_image_path(date_str, period_key)
     
-    if image_path.exists():
+    if image_path is not None and image_path.exists():
         # Load and display cached image
         st.image(str(image_path), use_container_width=True)
         st.success(f"✅ Showing cumulative heatmap for {time_period}")
     else:
-        # Generate heatmap on-the-fly (fallback)
-        st.info("⏳ Generating heatmap... This may take a moment.")
-        heatmap_data = load_heatmap_data(date_str)
-        
-        if heatmap_data is None:
-            st.warning("⚠️ No heatmap data available for this date.")
-            st.info("💡 **Note:** Heatmap data requires the full cache files which are not included in the web deployment version due to storage limitations (~7GB). Please use the local version for full heatmap functionality.")
-            return
-        
-        cumulative_heatmaps = heatmap_data['cumulative_heatmaps']
-        time_indices = heatmap_data['time_indices']
-        
-        # Define time ranges
-        time_ranges = {
-            "full": (2160, 7920),      # 06:00 - 22:00
-            "morning": (2160, 4320),   # 06:00 - 12:00
-            "afternoon": (4320, 6480), # 12:00 - 18:00
-            "evening": (6480, 7920)    # 18:00 - 22:00
-        }
-        start_idx, end_idx = time_ranges[period_key]
-        
-        # Find the heatmap at end time
-        target_idx = None
-        for i, t in enumerate(time_indices):
-            if t <= end_idx:
-                target_idx = i
+        # Render on-the-fly; results are cached on disk so repeated windows are instant
+        with st.spinner("⏳ Generating heatmap... This may take a moment."):
+            heatmap_png = get_heatmap_png(date_str, start_idx, end_idx, image_title)
+        
+        if heatmap_png is None:
+            if load_heatmap_store(date_str) is None:
+                st.warning("⚠️ No heatmap data available for this date.")
+                st.info("💡 **Note:** Heatmaps are built from the positions cache or a delta-encoded heatmap store (`python -m src.heatmap_store`). Neither is available for this date.")
             else:
-                break
-        
-        baseline_idx = None
-        for i, t in enumerate(time_indices):
-            if t <= start_idx:
-                baseline_idx = i
-            else:
-                break
-        
-        if target_idx is None:
-            st.error("No data in selected time range")
+                st.error("No data in selected time range")
             return
         
-        # Calculate difference
-        if baseline_idx is not None and baseline_idx < len(cumulative_heatmaps):
-            heatmap_diff = cumulative_heatmaps[target_idx].astype(float) - cumulative_heatmaps[baseline_idx].astype(float)
-            heatmap_diff[heatmap_diff < 0] = 0
-        else:
-            heatmap_diff = cumulative_heatmaps[target_idx].astype(float)
-        
-        # Create visualization
-        import matplotlib.pyplot as plt
-        from matplotlib.colors import LinearSegmentedColormap
-        from scipy.ndimage import gaussian_filter
-        
-        map_img = load_map_image()
-        if map_img is None:
-            map_img = Image.new('RGB', (696, 509), color='white')
-        
-        fig, ax = plt.subplots(figsize=(14, 10), dpi=100)
-        ax.imshow(map_img)
-        
-        colors = ['#00000000', '#ffff00ff', '#ff8c00ff', '#ff0000ff', '#8b0000ff']
-        cmap = LinearSegmentedColormap.from_list('custom_heat', colors, N=256)
-        
-        heatmap_display = gaussian_filter(heatmap_diff, sigma=2.0)
-        max_val = np.max(heatmap_display)
-        if max_val > 0:
-            heatmap_display = np.sqrt(heatmap_display / max_val) * max_val
-        heatmap_display[heatmap_display == 0] = np.nan
-        
-        ax.imshow(heatmap_display, cmap=cmap, alpha=0.8, vmin=0, vmax=np.nanmax(cumulative_heatmaps[target_idx]) if np.nanmax(cumulative_heatmaps[target_idx]) > 0 else 1)
-        
-        # Add title
-        period_times = {
-            "full": "06:00 - 22:00",
-            "morning": "06:00 - 12:00",
-            "afternoon": "12:00 - 18:00",
-            "evening": "18:00 - 22:00"
-        }
-        ax.text(10, 30, f"{time_period.split('(')[0].strip()}: {period_times[period_key]}", 
-               fontsize=18, color='white', 
-               bbox=dict(boxstyle='round', facecolor='black', alpha=0.7), weight='bold')
-        
-        ax.axis('off')
-        plt.tight_layout(pad=0)
-        
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png', bbox_inches='tight', pad_inches=0)
-        buf.seek(0)
-        plt.close(fig)
-        
-        st.image(buf, use_container_width=True)
+        st.image(heatmap_png, use_container_width=True)
     
     # Stats section
     st.markdown("---")
@@ -1271,34 +1393,28 @@ def render_heatmap_video(date_str):
     st.markdown("---")
     
     # Check if full heatmap data is available
-    heatmap_data = load_heatmap_data(date_str)
+    heatmap_store = load_heatmap_store(date_str)
     
-    if heatmap_data is None:
-        st.warning("⚠️ **Animated Video not available in web deployment**")
+    if heatmap_store is None:
+        st.warning("⚠️ **No heatmap data for this date**")
         st.info("""
-        📦 **Storage Limitation**
+        📦 **Heatmap Store**
         
-        The animated heatmap feature requires the full heatmap cache files (~7GB for 21 days), 
-        which exceeds Streamlit Cloud's free tier storage limits.
+        The animated heatmap reads `Data/Cache/heatmap_deltas_{date}/`, a sparse
+        per-frame increment store (a few MB instead of the dense ~7GB stacks).
+        It is built automatically from the positions cache or from an existing
+        `heatmap_cumulative_{date}.npz`; run `python -m src.heatmap_store` to prebuild.
         
-        **Options:**
-        1. Use **Static Image** mode (recommended for web)
-        2. Run the dashboard locally with full cache data
-        3. Contact admin for enterprise deployment with full features
-        
-        💡 **Tip:** Static images provide the same insights with much faster loading!
+        💡 **Tip:** Static images are still available for every date.
         """)
         return
     
     # Original video playback code
-    cumulative_heatmaps = heatmap_data['cumulative_heatmaps']
-    time_indices = heatmap_data['time_indices']
+    time_indices = heatmap_store['time_indices']
     
-    # Load map
-    map_img = load_map_image()
-    if map_img is None:
+    # Map raster is shared (decoded once); warn if only the white fallback is available
+    if map_image_path() is None:
         st.warning("Map image not found")
-        map_img = Image.new('RGB', (696, 509), color='white')
     
     # Time selection using sliders
     st.subheader("⏰ Time Range")
@@ -1337,8 +1453,8 @@ def render_heatmap_video(date_str):
         end_minute = end_minutes % 60
         st.markdown(f"<h2 style='text-align: center; color: #1f2937; margin-top: 5px;'>⏰ {end_hour:02d}:{end_minute:02d}</h2>", unsafe_allow_html=True)
     
-    start_time_idx = (start_hour * 3600 + start_minute * 60) // 10 + 1
-    end_time_idx = (end_hour * 3600 + end_minute * 60) // 10 + 1
+    start_time_idx = minutes_to_time_index(start_minutes)
+    end_time_idx = minutes_to_time_index(end_minutes)
     
     if start_time_idx >= end_time_idx:
         st.error("End time must be after start time")
@@ -1369,9 +1485,10 @@ def render_heatmap_video(date_str):
         st.session_state.hm_playing = False
     
     # Filter time indices
-    valid_indices = [(i, t) for i, t in enumerate(time_indices) if start_time_idx <= t <= end_time_idx]
+    first_frame, stop_frame = frame_span(heatmap_store, start_time_idx, end_time_idx)
+    valid_times = time_indices[first_frame:stop_frame]
     
-    if len(valid_indices) == 0:
+    if len(valid_times) == 0:
         st.warning("No heatmap data in selected time range")
         return
     
@@ -1382,30 +1499,16 @@ def render_heatmap_video(date_str):
     # Auto-play logic
     if st.session_state.hm_playing:
         st.session_state.hm_current_idx += frame_skip
-        if st.session_state.hm_current_idx >= len(valid_indices):
-            st.session_state.hm_current_idx = len(valid_indices) - 1
+        if st.session_state.hm_current_idx >= len(valid_times):
+            st.session_state.hm_current_idx = len(valid_times) - 1
             st.session_state.hm_playing = False
     
-    current_frame_idx = min(st.session_state.hm_current_idx, len(valid_indices) - 1)
-    heatmap_idx, current_time_idx = valid_indices[current_frame_idx]
-    current_heatmap = cumulative_heatmaps[heatmap_idx]
+    current_frame_idx = min(st.session_state.hm_current_idx, len(valid_times) - 1)
+    current_time_idx = int(valid_times[current_frame_idx])
     
-    # Find baseline heatmap (just before start time)
-    baseline_idx = None
-    baseline_time_idx = start_time_idx - 1
-    for i, t in enumerate(time_indices):
-        if t <= baseline_time_idx:
-            baseline_idx = i
-        else:
-            break
-    
-    # Calculate difference from baseline
-    if baseline_idx is not None and baseline_idx < len(cumulative_heatmaps):
-        baseline_heatmap = cumulative_heatmaps[baseline_idx]
-        heatmap_diff = current_heatmap.astype(float) - baseline_heatmap.astype(float)
-        heatmap_diff[heatmap_diff < 0] = 0  # Remove negative values
-    else:
-        heatmap_diff = current_heatmap.astype(float)
+    # Accumulation since start time = cumulative[current] - cumulative[start - 1]
+    heatmap_diff = heatmap_window(heatmap_store, start_time_idx, current_time_idx).astype(float)
+    cumulative_max = heatmap_cumulative_max(heatmap_store, current_time_idx)
     
     # Create visualization
     import matplotlib.pyplot as plt
@@ -1413,7 +1516,7 @@ def render_heatmap_video(date_str):
     from scipy.ndimage import gaussian_filter
     
     fig, ax = plt.subplots(figsize=(14, 10), dpi=80)
-    ax.imshow(map_img)
+    draw_map(ax)
     
     # Create custom colormap (더 강한 색상)
     colors = ['#00000000', '#ffff00ff', '#ff8c00ff', '#ff0000ff', '#8b0000ff']
@@ -1431,7 +1534,7 @@ def render_heatmap_video(date_str):
     heatmap_display[heatmap_display == 0] = np.nan  # Make zeros transparent
     
     # Higher alpha for stronger visibility
-    im = ax.imshow(heatmap_display, cmap=cmap, alpha=0.8, vmin=0, vmax=np.nanmax(current_heatmap) if np.nanmax(current_heatmap) > 0 else 1)
+    im = ax.imshow(heatmap_display, cmap=cmap, alpha=0.8, vmin=0, vmax=cumulative_max if cumulative_max > 0 else 1)
     
     # Add time text (top-left)
     current_time_str = time_index_to_time(current_time_idx)
@@ -1451,9 +1554,9 @@ def render_heatmap_video(date_str):
     st.image(buf, use_container_width=True)
     
     # Progress bar
-    progress = st.session_state.hm_current_idx / max(len(valid_indices) - 1, 1)
+    progress = st.session_state.hm_current_idx / max(len(valid_times) - 1, 1)
     st.progress(progress)
-    st.caption(f"Frame {st.session_state.hm_current_idx + 1} / {len(valid_indices)}")
+    st.caption(f"Frame {st.session_state.hm_current_idx + 1} / {len(valid_times)}")
     
     # Stats
     col1, col2, col3 = st.columns(3)
@@ -1853,7 +1956,7 @@ def render_journey_analysis(date_str):
         
         # Create figure
         fig_map, ax = plt.subplots(figsize=(16, 12))
-        ax.imshow(map_img, aspect='auto')
+        draw_map(ax, aspect='auto')
         ax.axis('off')
         
         # Step 1: Draw ALL zone circles first (background layer)
@@ -2053,7 +2156,7 @@ def render_journey_prediction(date_str):
                         return x1 + nx * offset, y1 + ny * offset, x2 - nx * offset, y2 - ny * offset
                     
                     fig_map, ax = plt.subplots(figsize=(12, 9))
-                    ax.imshow(map_img, aspect='auto')
+                    draw_map(ax, aspect='auto')
                     ax.axis('off')
                     
                     # Step 1: Draw ALL zone circles (background)
@@ -2237,7 +2340,7 @@ def render_journey_prediction(date_str):
                         return x1 + nx * offset, y1 + ny * offset, x2 - nx * offset, y2 - ny * offset
                     
                     fig_map, ax = plt.subplots(figsize=(12, 9))
-                    ax.imshow(map_img, aspect='auto')
+                    draw_map(ax, aspect='auto')
                     ax.axis('off')
                     
                     # Step 1: Draw ALL zone circles (background)
@@ -2357,6 +2460,70 @@ def render_journey_prediction(date_str):
                     💡 {top_src}에 {selected_zone} 관련 프로모션/안내를 배치하면 유입 증대가 가능합니다.
                     """)
 
+# =====================================================
+# DIAGNOSTICS
+# =====================================================
+
+def render_diagnostics(date_str):
+    """Render diagnostics page with per-date data cache counters"""
+    st.title("🩺 Diagnostics")
+    st.markdown("---")
+    
+    st.subheader("💾 Per-date Data Cache")
+    
+    with st.expander("ℹ️ About the data cache", expanded=False):
+        st.markdown("""
+        Position, statistics and heatmap data are kept in a shared in-memory cache with a byte budget.
+        
+        - **Hit**: data served from memory
+        - **Miss**: data loaded from disk
+        - **Eviction**: least recently used entry dropped to stay within the budget
+        - **Oversize**: entry larger than the whole budget, served without caching
+        
+        The budget is set with the `DEEPCOMMERCE_CACHE_MB` environment variable.
+        """)
+    
+    stats = DATA_CACHE.stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Memory Used", f"{stats['total_bytes'] / 1024 / 1024:.1f} MB")
+    with col2:
+        st.metric("Budget", f"{stats['budget_bytes'] / 1024 / 1024:.0f} MB")
+    with col3:
+        st.metric("Entries", stats['entries'])
+    with col4:
+        st.metric("Hit Rate", f"{stats['hit_rate'] * 100:.1f}%")
+    
+    st.progress(min(stats['total_bytes'] / stats['budget_bytes'], 1.0) if stats['budget_bytes'] else 0.0)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Hits", f"{stats['hits']:,}")
+    with col2:
+        st.metric("Misses", f"{stats['misses']:,}")
+    with col3:
+        st.metric("Evictions", f"{stats['evictions']:,}")
+    with col4:
+        st.metric("Oversize", f"{stats['oversize']:,}")
+    
+    entries = DATA_CACHE.entries()
+    if entries:
+        entries_df = pd.DataFrame(entries[::-1])
+        entries_df['size_mb'] = (entries_df['nbytes'] / 1024 / 1024).round(2)
+        entries_df['loaded_at'] = pd.to_datetime(entries_df['loaded_at'], unit='s').dt.strftime('%H:%M:%S')
+        st.dataframe(
+            entries_df[['loader', 'args', 'size_mb', 'hits', 'loaded_at']],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("Cache is empty")
+    
+    if st.button("🗑️ Clear data cache", key="diag_clear_cache"):
+        DATA_CACHE.clear()
+        st.rerun()
+
 # =====================================================
 # MAIN APP
 # =====================================================
@@ -2382,6 +2549,8 @@ def main():
         render_journey_analysis(selected_date)
     elif "Flow Prediction" in selected_menu:
         render_journey_prediction(selected_date)
+    elif "Diagnostics" in selected_menu:
+        render_diagnostics(selected_date)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,225 @@
+"""
+Partitioned Positions Dataset
+positions 캐시를 date/hour Hive 파티션 데이터셋으로 저장/조회하는 함수들
+
+Layout:
+    Data/Cache/positions/date=YYYY-MM-DD/hour=HH/part-0.parquet
+
+각 파일은 time_index 순으로 정렬되어 있고 10분(60 슬롯) 단위 row group으로 나뉘며,
+row group마다 min/max 통계가 기록됩니다. 시간 구간 조회 시 hour 파티션과
+row group 통계로 필요한 부분만 읽습니다.
+
+Usage:
+    python -m src.cache_dataset                  # positions_*.parquet → 데이터셋 변환
+    python -m src.cache_dataset --remove-legacy  # 변환 후 기존 파일 삭제
+"""
+import argparse
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import List, Optional
+
+from src.cache_schema import (
+    SCHEMA_VERSION,
+    SCHEMA_VERSION_KEY,
+    to_compact_positions
+)
+from src.time_axis import SECONDS_PER_SLOT
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+POSITIONS_DATASET_DIR = CACHE_DIR / 'positions'
+
+SLOTS_PER_HOUR = 3600 // SECONDS_PER_SLOT
+# row group 하나 = 10분 (60 슬롯)
+ROW_GROUP_SLOTS = 60
+
+HOUR_PARTITIONING = ds.partitioning(pa.schema([('hour', pa.uint8())]), flavor='hive')
+
+# MAC / S-Ward는 parquet 자체 dictionary 페이지로 저장하고 읽을 때 dictionary로 복원
+# (arrow dictionary를 그대로 쓰면 row group마다 전체 사전이 중복 기록됨)
+DICTIONARY_COLUMNS = ['mac_address', 'sward_name']
+PARQUET_FORMAT = ds.ParquetFileFormat(
+    read_options=ds.ParquetReadOptions(dictionary_columns=DICTIONARY_COLUMNS)
+)
+
+
+def time_index_to_hour(time_index):
+    """time_index (scalar or array) → hour partition (0 ~ 23)"""
+    return (time_index - 1) // SLOTS_PER_HOUR
+
+
+def positions_date_dir(date_str: str) -> Path:
+    return POSITIONS_DATASET_DIR / f'date={date_str}'
+
+
+def legacy_positions_file(date_str: str) -> Path:
+    return CACHE_DIR / f'positions_{date_str}.parquet'
+
+
+def positions_source_files(date_str: str) -> List[Path]:
+    """
+    해당 날짜의 positions 파일 목록 (데이터셋 우선, 없으면 단일 parquet)
+
+    Returns:
+        List of parquet paths, empty if the date has no position cache
+    """
+    date_dir = positions_date_dir(date_str)
+    if date_dir.exists():
+        files = sorted(date_dir.glob('hour=*/*.parquet'))
+        if files:
+            return files
+    legacy_file = legacy_positions_file(date_str)
+    return [legacy_file] if legacy_file.exists() else []
+
+
+def write_positions_dataset(positions_df: pd.DataFrame, date_str: str):
+    """
+    하루치 positions를 hour 파티션 데이터셋으로 저장
+
+    임시 디렉토리에 모두 쓴 뒤 기존 date 파티션과 교체합니다.
+
+    Args:
+        positions_df: Positions DataFrame for one date
+        date_str: Date (YYYY-MM-DD)
+    """
+    df = to_compact_positions(positions_df)
+    df = df.sort_values('time_index', kind='stable').reset_index(drop=True)
+    hours = time_index_to_hour(df['time_index'].to_numpy().astype('int64'))
+    row_groups = (df['time_index'].to_numpy().astype('int64') - 1) // ROW_GROUP_SLOTS
+
+    date_dir = positions_date_dir(date_str)
+    tmp_dir = date_dir.with_name(date_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for col in DICTIONARY_COLUMNS:
+        if col in table.column_names and pa.types.is_dictionary(table.schema.field(col).type):
+            table = table.set_column(
+                table.column_names.index(col), col, table[col].cast(pa.string())
+            )
+    metadata = dict(table.schema.metadata or {})
+    metadata[SCHEMA_VERSION_KEY] = str(SCHEMA_VERSION).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    for hour in pd.unique(hours):
+        hour_rows = hours == hour
+        hour_dir = tmp_dir / f'hour={int(hour):02d}'
+        hour_dir.mkdir(parents=True)
+        with pq.ParquetWriter(hour_dir / 'part-0.parquet', table.schema, compression='zstd') as writer:
+            for group in pd.unique(row_groups[hour_rows]):
+                group_rows = (row_groups == group).nonzero()[0]
+                chunk = table.slice(group_rows[0], len(group_rows))
+                writer.write_table(chunk, row_group_size=len(group_rows))
+
+    if date_dir.exists():
+        shutil.rmtree(date_dir)
+    tmp_dir.rename(date_dir)
+
+
+def read_positions_table(
+    date_str: str,
+    start_time_idx: Optional[int] = None,
+    end_time_idx: Optional[int] = None,
+    columns: Optional[List[str]] = None
+) -> Optional[pa.Table]:
+    """
+    날짜별 positions 조회 (시간 구간 predicate pushdown)
+
+    Args:
+        date_str: Date (YYYY-MM-DD)
+        start_time_idx, end_time_idx: Inclusive time_index window (None = open)
+        columns: Columns to read (None = all)
+
+    Returns:
+        Arrow table sorted by time_index, or None if the date has no position cache
+    """
+    files = positions_source_files(date_str)
+    if not files:
+        return None
+
+    condition = None
+    if start_time_idx is not None:
+        condition = ds.field('time_index') >= start_time_idx
+    if end_time_idx is not None:
+        end_condition = ds.field('time_index') <= end_time_idx
+        condition = end_condition if condition is None else condition & end_condition
+
+    if files[0].parent.parent == positions_date_dir(date_str):
+        # 파일 목록으로 열어 date 디렉토리의 파생 파일(position_index.npz 등)은 무시
+        dataset = ds.dataset(
+            [str(f) for f in files],
+            format=PARQUET_FORMAT,
+            partitioning=HOUR_PARTITIONING,
+            partition_base_dir=str(positions_date_dir(date_str))
+        )
+        hour_condition = None
+        if start_time_idx is not None:
+            hour_condition = ds.field('hour') >= max(time_index_to_hour(start_time_idx), 0)
+        if end_time_idx is not None:
+            end_hour = ds.field('hour') <= max(time_index_to_hour(end_time_idx), 0)
+            hour_condition = end_hour if hour_condition is None else hour_condition & end_hour
+        if hour_condition is not None:
+            condition = hour_condition & condition
+        read_columns = columns or [name for name in dataset.schema.names if name != 'hour']
+        table = dataset.to_table(columns=read_columns, filter=condition)
+        return table.sort_by('time_index')
+
+    dataset = ds.dataset(files[0], format=PARQUET_FORMAT)
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def read_positions(
+    date_str: str,
+    start_time_idx: Optional[int] = None,
+    end_time_idx: Optional[int] = None
+) -> Optional[pd.DataFrame]:
+    """read_positions_table의 pandas 버전 (compact 스키마 적용)"""
+    table = read_positions_table(date_str, start_time_idx, end_time_idx)
+    if table is None:
+        return None
+    return to_compact_positions(table.to_pandas())
+
+
+def migrate_legacy_positions(remove_legacy: bool = False) -> List[str]:
+    """
+    Data/Cache/positions_*.parquet → 파티션 데이터셋 변환
+
+    Returns:
+        List of converted dates
+    """
+    converted = []
+    for legacy_file in sorted(CACHE_DIR.glob('positions_*.parquet')):
+        date_str = legacy_file.stem.replace('positions_', '')
+        write_positions_dataset(pd.read_parquet(legacy_file), date_str)
+        if remove_legacy:
+            legacy_file.unlink()
+        converted.append(date_str)
+    return converted
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert positions caches to the date/hour partitioned dataset')
+    parser.add_argument('--remove-legacy', action='store_true', help='delete positions_*.parquet after conversion')
+    args = parser.parse_args()
+
+    converted = migrate_legacy_positions(remove_legacy=args.remove_legacy)
+    if not converted:
+        print(f"No positions_*.parquet found in {CACHE_DIR}")
+        return
+
+    from src.cache_manifest import update_manifest
+    update_manifest(converted)
+    for date_str in converted:
+        files = positions_source_files(date_str)
+        row_groups = sum(pq.ParquetFile(f).num_row_groups for f in files)
+        print(f"{date_str}: {len(files)} hour partitions, {row_groups} row groups")
+
+
+if __name__ == '__main__':
+    main()
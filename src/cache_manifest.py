@@ -0,0 +1,188 @@
+"""
+Cache Manifest
+Data/Cache의 날짜별 캐시 카탈로그(manifest.json) 생성/조회 함수들
+
+manifest.json은 날짜별 positions / stats 캐시의 파일 수, 크기, row 수, schema version을 기록합니다.
+사이드바는 파일 시스템을 glob하지 않고 이 manifest만 읽습니다.
+
+Usage:
+    python -m src.cache_manifest   # Data/Cache를 스캔해 manifest.json 재생성
+"""
+import json
+import threading
+import time
+import pyarrow.parquet as pq
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.cache_dataset import POSITIONS_DATASET_DIR, positions_source_files
+from src.cache_schema import read_schema_version
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+MANIFEST_FILE = CACHE_DIR / 'manifest.json'
+MANIFEST_VERSION = 1
+
+# manifest mtime 재확인 주기 (초) - 이 시간 안의 rerun은 파일 시스템을 건드리지 않음
+REVALIDATE_SECONDS = 5.0
+
+_memo_lock = threading.Lock()
+_memo = {'checked_at': 0.0, 'mtime_ns': None, 'manifest': None}
+
+
+def _is_date(date_str: str) -> bool:
+    return len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+
+
+def _describe_files(files: List[Path]) -> Optional[Dict]:
+    if not files:
+        return None
+    return {
+        'files': len(files),
+        'bytes': sum(f.stat().st_size for f in files),
+        'rows': sum(pq.ParquetFile(f).metadata.num_rows for f in files),
+        'schema_version': min(read_schema_version(f) for f in files)
+    }
+
+
+def describe_date(date_str: str) -> Dict:
+    """
+    한 날짜의 캐시 정보
+
+    Returns:
+        Dict with 'positions' and 'stats' entries (each None if missing):
+        - files, bytes, rows, schema_version
+    """
+    stats_file = CACHE_DIR / f'stats_timeseries_{date_str}.parquet'
+    return {
+        'positions': _describe_files(positions_source_files(date_str)),
+        'stats': _describe_files([stats_file] if stats_file.exists() else [])
+    }
+
+
+def scan_cache_dates() -> List[str]:
+    """Data/Cache에서 캐시가 존재하는 날짜 목록 (glob, manifest 재생성용)"""
+    dates = set()
+    for f in CACHE_DIR.glob('positions_*.parquet'):
+        dates.add(f.stem.replace('positions_', ''))
+    for d in POSITIONS_DATASET_DIR.glob('date=*'):
+        dates.add(d.name.replace('date=', ''))
+    for f in CACHE_DIR.glob('stats_timeseries_*.parquet'):
+        dates.add(f.stem.replace('stats_timeseries_', ''))
+    return sorted(d for d in dates if _is_date(d))
+
+
+def _write_manifest(manifest: Dict):
+    manifest['generated_at'] = datetime.now().isoformat(timespec='seconds')
+    tmp_file = MANIFEST_FILE.with_suffix('.json.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    tmp_file.replace(MANIFEST_FILE)
+
+
+def rebuild_manifest() -> Dict:
+    """Data/Cache 전체를 스캔해 manifest.json 재생성"""
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'dates': {date_str: describe_date(date_str) for date_str in scan_cache_dates()}
+    }
+    _write_manifest(manifest)
+    return manifest
+
+
+def update_manifest(dates: Iterable[str]) -> Dict:
+    """
+    지정한 날짜 항목만 갱신 (precompute/마이그레이션 단계에서 호출)
+
+    캐시가 모두 사라진 날짜는 manifest에서 제거됩니다.
+    """
+    manifest = read_manifest() or {'version': MANIFEST_VERSION, 'dates': {}}
+    for date_str in dates:
+        entry = describe_date(date_str)
+        if entry['positions'] is None and entry['stats'] is None:
+            manifest['dates'].pop(date_str, None)
+        else:
+            manifest['dates'][date_str] = entry
+    _write_manifest(manifest)
+    return manifest
+
+
+def read_manifest() -> Optional[Dict]:
+    """manifest.json 직접 읽기 (memo 없음)"""
+    if not MANIFEST_FILE.exists():
+        return None
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_manifest() -> Optional[Dict]:
+    """
+    memo된 manifest 반환
+
+    REVALIDATE_SECONDS마다 한 번만 mtime을 확인하고, 바뀐 경우에만 다시 읽습니다.
+    프로세스 내 모든 세션이 같은 객체를 공유하므로 반환값을 수정하지 마세요.
+    """
+    now = time.monotonic()
+    with _memo_lock:
+        if now - _memo['checked_at'] < REVALIDATE_SECONDS:
+            return _memo['manifest']
+        _memo['checked_at'] = now
+        try:
+            mtime_ns = MANIFEST_FILE.stat().st_mtime_ns
+        except FileNotFoundError:
+            _memo['mtime_ns'] = None
+            _memo['manifest'] = None
+            return None
+        if mtime_ns != _memo['mtime_ns']:
+            _memo['manifest'] = read_manifest()
+            _memo['mtime_ns'] = mtime_ns
+        return _memo['manifest']
+
+
+def get_manifest_dates() -> Optional[List[str]]:
+    """
+    manifest 기준 사용 가능한 날짜 목록 (최신순)
+
+    positions가 있는 날짜가 하나라도 있으면 그 날짜들만, 없으면 stats만 있는 날짜까지 반환합니다.
+
+    Returns:
+        List of dates, or None if there is no manifest
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        return None
+    dates = manifest['dates']
+    with_positions = [d for d, entry in dates.items() if entry.get('positions')]
+    return sorted(with_positions or dates.keys(), reverse=True)
+
+
+def get_stats_dates() -> List[str]:
+    """
+    stats 캐시가 있는 날짜 목록 (오래된 순, 여러 날짜 비교용)
+
+    manifest가 있으면 manifest 기준, 없으면 stats 파일 glob
+    """
+    manifest = load_manifest()
+    if manifest is not None:
+        return sorted(d for d, entry in manifest['dates'].items() if entry.get('stats'))
+    return sorted(
+        d for d in (f.stem.replace('stats_timeseries_', '') for f in CACHE_DIR.glob('stats_timeseries_*.parquet'))
+        if _is_date(d)
+    )
+
+
+def main():
+    manifest = rebuild_manifest()
+    for date_str, entry in sorted(manifest['dates'].items()):
+        parts = [
+            f"{kind} {info['rows']:,} rows / {info['bytes'] / 1024:.0f} KB (v{info['schema_version']})"
+            for kind, info in entry.items() if info
+        ]
+        print(f"{date_str}: " + ', '.join(parts))
+    print(f"\nWrote {MANIFEST_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Compact Cache Schema
+positions / stats parquet 캐시의 compact dtype 스키마 및 마이그레이션 도구
+
+Usage:
+    python -m src.cache_schema            # Data/Cache의 모든 날짜 마이그레이션
+    python -m src.cache_schema --dry-run  # 변경 없이 절감량만 측정
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+from typing import Dict
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+
+SCHEMA_VERSION = 2
+SCHEMA_VERSION_KEY = b'deepcommerce.schema_version'
+
+# 컬럼별 compact dtype (MAC / S-Ward id는 dictionary 인코딩)
+POSITIONS_DTYPES = {
+    'time_index': 'uint16',
+    'mac_address': 'category',
+    'x': 'float32',
+    'y': 'float32',
+    'sward_name': 'category',
+    'rssi': 'int8',
+    'num_swards': 'uint8',
+    'is_randomized_ios': 'bool'
+}
+
+# 랜덤화된 MAC 주소의 첫 옥텟 (iOS 기기로 분류)
+IOS_MAC_PREFIXES = (b'02:', b'06:', b'0A:', b'0E:')
+
+STATS_DTYPES = {
+    'time_index': 'uint16',
+    'sward_name': 'category',
+    'count': 'uint8',
+    'total_devices': 'uint16'
+}
+
+
+def _fits(series: pd.Series, dtype: str) -> bool:
+    if len(series) == 0:
+        return True
+    info = np.iinfo(dtype)
+    return info.min <= series.min() and series.max() <= info.max
+
+
+def apply_compact_dtypes(df: pd.DataFrame, dtypes: Dict[str, str]) -> pd.DataFrame:
+    """
+    DataFrame 컬럼을 compact dtype으로 변환
+
+    정수 범위를 벗어나는 컬럼은 원래 dtype을 유지합니다.
+    이미 compact인 컬럼은 변환하지 않으므로 반복 호출해도 비용이 거의 없습니다.
+
+    Args:
+        df: positions or stats DataFrame
+        dtypes: POSITIONS_DTYPES or STATS_DTYPES
+
+    Returns:
+        New DataFrame (input is not modified)
+    """
+    conversions = {}
+    for col, dtype in dtypes.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if dtype.startswith(('int', 'uint')) and not _fits(df[col], dtype):
+            continue
+        conversions[col] = dtype
+    if not conversions:
+        return df
+    return df.astype(conversions)
+
+
+def classify_randomized_ios(mac_address) -> np.ndarray:
+    """
+    MAC 주소 → iOS(랜덤화 MAC) 여부
+
+    문자열 비교 대신 앞 3바이트를 고정 길이 bytes 배열로 잘라 비교하며,
+    categorical 입력은 고유 MAC(카테고리)만 분류한 뒤 코드로 펼칩니다.
+
+    Args:
+        mac_address: Series / array of MAC address strings (categorical or not)
+
+    Returns:
+        Boolean array, True where the first octet is 02, 06, 0A or 0E
+    """
+    if isinstance(getattr(mac_address, 'dtype', None), pd.CategoricalDtype):
+        categories = classify_randomized_ios(mac_address.cat.categories.to_numpy())
+        codes = mac_address.cat.codes.to_numpy()
+        return np.where(codes >= 0, categories[codes], False) if len(categories) else np.zeros(len(codes), dtype=bool)
+    prefixes = np.asarray(mac_address, dtype='S3')
+    return np.isin(prefixes, np.array(IOS_MAC_PREFIXES, dtype='S3'))
+
+
+def to_compact_positions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    positions DataFrame을 compact 스키마로 변환
+
+    is_randomized_ios 컬럼이 없으면 mac_address로부터 한 번 계산해 추가합니다.
+    """
+    if 'is_randomized_ios' not in df.columns and 'mac_address' in df.columns:
+        df = df.assign(is_randomized_ios=classify_randomized_ios(df['mac_address']))
+    return apply_compact_dtypes(df, POSITIONS_DTYPES)
+
+
+def to_compact_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """stats DataFrame을 compact 스키마로 변환"""
+    return apply_compact_dtypes(df, STATS_DTYPES)
+
+
+def write_compact_parquet(df: pd.DataFrame, path: Path):
+    """
+    compact DataFrame을 parquet으로 저장 (schema version 메타데이터 포함)
+
+    임시 파일에 쓴 뒤 교체하므로 실행 중인 대시보드가 반쯤 쓰인 파일을 읽지 않습니다.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SCHEMA_VERSION_KEY] = str(SCHEMA_VERSION).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    pq.write_table(table, tmp_path, compression='zstd')
+    tmp_path.replace(path)
+
+
+def read_schema_version(path: Path) -> int:
+    """parquet 파일의 schema version (메타데이터 없으면 1)"""
+    metadata = pq.read_schema(path).metadata or {}
+    return int(metadata.get(SCHEMA_VERSION_KEY, b'1'))
+
+
+def _measure(path: Path) -> Dict:
+    start = time.perf_counter()
+    df = pd.read_parquet(path)
+    load_s = time.perf_counter() - start
+    return {
+        'df': df,
+        'load_ms': load_s * 1000,
+        'memory_mb': df.memory_usage(deep=True).sum() / 1024 / 1024,
+        'file_kb': path.stat().st_size / 1024
+    }
+
+
+def migrate_cache_dir(cache_dir: Path = CACHE_DIR, dry_run: bool = False) -> pd.DataFrame:
+    """
+    캐시 디렉토리의 positions / stats parquet을 compact 스키마로 마이그레이션
+
+    Args:
+        cache_dir: Directory containing positions_*.parquet / stats_timeseries_*.parquet
+        dry_run: Measure only, do not rewrite files
+
+    Returns:
+        DataFrame report with per-file file size, in-memory size and load time
+        before/after migration
+    """
+    targets = [
+        (path, to_compact_positions) for path in sorted(cache_dir.glob('positions_*.parquet'))
+    ] + [
+        (path, to_compact_stats) for path in sorted(cache_dir.glob('stats_timeseries_*.parquet'))
+    ]
+
+    rows = []
+    for path, convert in targets:
+        before = _measure(path)
+        compact = convert(before['df'])
+
+        if dry_run:
+            after_memory = compact.memory_usage(deep=True).sum() / 1024 / 1024
+            after = {'load_ms': np.nan, 'memory_mb': after_memory, 'file_kb': np.nan}
+        else:
+            write_compact_parquet(compact, path)
+            after = _measure(path)
+
+        rows.append({
+            'file': path.name,
+            'file_kb_before': before['file_kb'],
+            'file_kb_after': after['file_kb'],
+            'memory_mb_before': before['memory_mb'],
+            'memory_mb_after': after['memory_mb'],
+            'load_ms_before': before['load_ms'],
+            'load_ms_after': after['load_ms']
+        })
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate Data/Cache parquet files to the compact schema')
+    parser.add_argument('--cache-dir', type=Path, default=CACHE_DIR)
+    parser.add_argument('--dry-run', action='store_true', help='measure only, do not rewrite files')
+    args = parser.parse_args()
+
+    report = migrate_cache_dir(args.cache_dir, dry_run=args.dry_run)
+    if len(report) == 0:
+        print(f"No cache files found in {args.cache_dir}")
+        return
+    if not args.dry_run:
+        from src.cache_manifest import rebuild_manifest
+        rebuild_manifest()
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(report.round(2).to_string(index=False))
+
+    totals = report.drop(columns='file').sum()
+    print(
+        f"\nTotal memory: {totals['memory_mb_before']:.2f} MB -> {totals['memory_mb_after']:.2f} MB"
+        f" ({1 - totals['memory_mb_after'] / totals['memory_mb_before']:.0%} less)"
+    )
+    if not args.dry_run:
+        print(
+            f"Total file size: {totals['file_kb_before']:.0f} KB -> {totals['file_kb_after']:.0f} KB, "
+            f"load time: {totals['load_ms_before']:.0f} ms -> {totals['load_ms_after']:.0f} ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Per-date Data Cache
+바이트 예산 기반 LRU 메모리 캐시 (날짜별 DataFrame / heatmap 배열용)
+
+st.cache_data는 max_entries/TTL 없이 모든 날짜의 데이터를 프로세스가 끝날 때까지 보관합니다.
+이 캐시는 전체 크기가 예산(DEEPCOMMERCE_CACHE_MB, 기본 1024MB)을 넘으면
+가장 오래 사용되지 않은 항목부터 제거하고, hit/miss/eviction 카운터를 제공합니다.
+
+캐시된 객체는 모든 세션이 공유하므로 호출하는 쪽에서 수정하면 안 됩니다.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List
+
+
+DEFAULT_BUDGET_MB = 1024
+
+
+def estimate_nbytes(value) -> int:
+    """캐시 항목의 메모리 크기 추정 (DataFrame, ndarray, dict/list/tuple 재귀)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.memmap):
+        return 0  # 파일 매핑: 페이지 캐시에 올라가며 프로세스 메모리 예산과 무관
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ByteBudgetLRUCache:
+    """
+    바이트 예산 LRU 캐시
+
+    Args:
+        budget_bytes: Total size limit; least recently used entries are evicted beyond it.
+            Values larger than the whole budget are returned without being cached.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.oversize = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry['hits'] += 1
+                self.hits += 1
+                return entry['value']
+            self.misses += 1
+
+        value = loader()
+        if value is None:
+            return None
+
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            if nbytes > self.budget_bytes:
+                self.oversize += 1
+                return value
+            if key in self._entries:
+                # 다른 세션이 먼저 로드한 경우 그 객체를 공유
+                return self._entries[key]['value']
+            self._entries[key] = {
+                'value': value,
+                'nbytes': nbytes,
+                'loaded_at': time.time(),
+                'hits': 0
+            }
+            self.total_bytes += nbytes
+            while self.total_bytes > self.budget_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted['nbytes']
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict:
+        """캐시 카운터 (hits, misses, evictions, oversize, entries, total/budget bytes, hit_rate)"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'oversize': self.oversize,
+                'entries': len(self._entries),
+                'total_bytes': self.total_bytes,
+                'budget_bytes': self.budget_bytes,
+                'hit_rate': self.hits / requests if requests else 0.0
+            }
+
+    def entries(self) -> List[Dict]:
+        """캐시 항목 목록 (LRU → MRU 순)"""
+        with self._lock:
+            return [
+                {
+                    'loader': key[0],
+                    'args': ', '.join(str(arg) for arg in key[1:]),
+                    'nbytes': entry['nbytes'],
+                    'loaded_at': entry['loaded_at'],
+                    'hits': entry['hits']
+                }
+                for key, entry in self._entries.items()
+            ]
+
+
+DATA_CACHE = ByteBudgetLRUCache(
+    int(float(os.environ.get('DEEPCOMMERCE_CACHE_MB', DEFAULT_BUDGET_MB)) * 1024 * 1024)
+)
+
+
+def per_date_cache(func: Callable) -> Callable:
+    """
+    로더 함수를 DATA_CACHE로 memo하는 decorator (st.cache_data 대체)
+
+    인자는 hashable이어야 하며 (모듈.함수 이름, 인자) 튜플이 캐시 키가 됩니다
+    (다른 모듈의 같은 이름 함수끼리 항목을 공유하지 않음).
+    None 결과(캐시 파일 없음)는 캐시하지 않습니다.
+    """
+    loader_name = f'{func.__module__}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (loader_name,) + args + tuple(sorted(kwargs.items()))
+        return DATA_CACHE.get_or_load(key, lambda: func(*args, **kwargs))
+
+    wrapper.cache = DATA_CACHE
+    return wrapper
@@ -0,0 +1,169 @@
+"""
+Per-date Data Loading Functions
+날짜별 positions / stats 캐시 로딩 함수들
+"""
+import time
+import streamlit as st
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.data_cache import per_date_cache
+from src.cache_dataset import read_positions
+from src.cache_schema import STATS_DTYPES
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+SWARD_CSV = PROJECT_ROOT / 'Data' / 'SWard_description' / 'swards.csv'
+
+
+@st.cache_data
+def load_sward_descriptions():
+    """Load S-Ward descriptions and zone information"""
+    if not SWARD_CSV.exists():
+        return None
+    df = pd.read_csv(SWARD_CSV)
+    return df
+
+
+def _read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    numpy 기반 컬럼을 쓰기 금지 배열로 교체한 DataFrame 반환
+
+    값 변경(df.loc[...] = ...)은 ValueError로 막힙니다.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if isinstance(values.dtype, np.dtype):
+            arr = values.to_numpy(copy=True)
+            arr.flags.writeable = False
+            values = pd.Series(arr, index=df.index, name=col, copy=False)
+        columns[col] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+@per_date_cache
+def load_zone_positions(date_str: str) -> Optional[pd.DataFrame]:
+    """
+    zone 컬럼이 추가된 positions 로드 (세션 간 공유되는 읽기 전용 객체)
+
+    rerun마다 해시/복사하지 않고 DATA_CACHE의 같은 객체를 반환하므로,
+    호출하는 쪽에서는 절대 수정하지 말고 필터링/assign으로 새 DataFrame을 만들어 사용합니다.
+
+    Returns:
+        DataFrame with positions columns plus:
+        - zone: categorical zone name (NaN for S-Wards missing from swards.csv)
+    """
+    if not SWARD_CSV.exists():
+        return None
+    positions_df = read_positions(date_str)
+    if positions_df is None:
+        return None
+
+    sward_df = pd.read_csv(SWARD_CSV)
+
+    zones = sorted(sward_df['description'].unique().tolist(), key=str.lower)
+    zone_mapping = dict(zip(sward_df['name'], sward_df['description']))
+    positions_df['zone'] = pd.Categorical(
+        positions_df['sward_name'].map(zone_mapping),
+        categories=zones
+    )
+
+    return _read_only(positions_df)
+
+
+def _range_dates(start_date: str, end_date: str) -> List[str]:
+    dates = pd.date_range(start_date, end_date, freq='D')
+    return [d.strftime('%Y-%m-%d') for d in dates]
+
+
+def _arrow_schema(dtypes: Dict[str, str], columns: List[str]) -> pa.Schema:
+    """compact dtype 정의 → 통일된 arrow 스키마 (날짜별 dictionary 인덱스 폭 차이 제거)"""
+    fields = []
+    for col in columns:
+        dtype = dtypes.get(col)
+        if dtype == 'category':
+            fields.append(pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+        elif dtype is not None:
+            fields.append(pa.field(col, pa.from_numpy_dtype(np.dtype(dtype))))
+    fields.append(pa.field('date', pa.dictionary(pa.int32(), pa.string())))
+    return pa.schema(fields)
+
+
+def _source_files(file_prefix: str, date_str: str) -> List[Path]:
+    cache_file = CACHE_DIR / f'{file_prefix}_{date_str}.parquet'
+    return [cache_file] if cache_file.exists() else []
+
+
+def _read_date_table(file_prefix: str, date_str: str, dtypes: Dict[str, str]) -> pa.Table:
+    table = pq.read_table(CACHE_DIR / f'{file_prefix}_{date_str}.parquet')
+    table = table.select([col for col in table.column_names if col in dtypes])
+    date_col = pa.DictionaryArray.from_arrays(
+        pa.array(np.zeros(table.num_rows, dtype=np.int32)),
+        pa.array([date_str])
+    )
+    table = table.append_column('date', date_col)
+    return table.cast(_arrow_schema(dtypes, table.column_names[:-1]))
+
+
+def read_date_range(
+    file_prefix: str,
+    start_date: str,
+    end_date: str,
+    dtypes: Dict[str, str],
+    max_workers: int = 8
+) -> Optional[pd.DataFrame]:
+    """
+    여러 날짜의 parquet 캐시를 스레드 풀에서 동시에 읽어 하나의 DataFrame으로 결합
+
+    Args:
+        file_prefix: Per-date cache file prefix ({file_prefix}_{date}.parquet, e.g. 'stats_timeseries')
+        start_date, end_date: Inclusive date range (YYYY-MM-DD)
+        dtypes: Compact dtypes of the cache (e.g. STATS_DTYPES)
+        max_workers: Thread pool size
+
+    Returns:
+        DataFrame ordered by date with an extra categorical 'date' column,
+        or None if no file exists in the range.
+        df.attrs['load_report'] holds dates, missing_dates, rows, bytes, seconds,
+        rows_per_s and mb_per_s.
+    """
+    dates = _range_dates(start_date, end_date)
+    files = {d: _source_files(file_prefix, d) for d in dates}
+    available = [d for d in dates if files[d]]
+    if not available:
+        return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(available))) as executor:
+        tables = list(executor.map(
+            lambda d: _read_date_table(file_prefix, d, dtypes), available
+        ))
+    table = pa.concat_tables(tables).unify_dictionaries()
+    df = table.to_pandas()
+    elapsed = time.perf_counter() - start
+
+    total_bytes = sum(f.stat().st_size for d in available for f in files[d])
+    df.attrs['load_report'] = {
+        'dates': available,
+        'missing_dates': [d for d in dates if d not in available],
+        'rows': len(df),
+        'bytes': total_bytes,
+        'seconds': elapsed,
+        'rows_per_s': len(df) / elapsed if elapsed > 0 else float('inf'),
+        'mb_per_s': total_bytes / 1024 / 1024 / elapsed if elapsed > 0 else float('inf')
+    }
+    return df
+
+
+@per_date_cache
+def load_stats_range(start_date: str, end_date: str) -> Optional[pd.DataFrame]:
+    """Load statistics cache data for a date range (inclusive), read in parallel"""
+    return read_date_range('stats_timeseries', start_date, end_date, STATS_DTYPES)
+
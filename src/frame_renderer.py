@@ -0,0 +1,293 @@
+"""
+Localization Frame Renderer
+matplotlib 없이 지도 위에 기기 위치를 그리는 경량 프레임 렌더러
+
+디코딩된 지도(NumPy 배열)를 출력 해상도로 한 번만 리사이즈해 두고,
+프레임마다 복사본 위에 미리 래스터화한 점 sprite를 찍은 뒤 JPEG/WebP로 인코딩합니다.
+"""
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from typing import Dict, Optional, Tuple
+
+from src.time_axis import time_index_to_time
+
+
+# 기존 matplotlib figure (14 x 10 in, dpi 80)와 같은 출력 폭
+DEFAULT_OUTPUT_WIDTH = 1120
+
+DEVICE_COLORS = {
+    'ios': (59, 130, 246),      # '#3b82f6'
+    'android': (239, 68, 68)    # '#ef4444'
+}
+DOT_ALPHA = 0.7
+
+# 크기는 지도 픽셀 단위 (출력 해상도에 맞춰 scale 배)
+DOT_RADIUS = 2.8
+DOT_EDGE_WIDTH = 0.7
+TIME_FONT_SIZE = 16
+COUNT_FONT_SIZE = 12
+LABEL_MARGIN = 6
+LABEL_PADDING = 4
+LABEL_ALPHA = 0.7
+
+# trail: 오래된 선분일수록 투명하게 (TRAIL_LEVELS 단계로 묶어서 그림)
+TRAIL_WIDTH = 1.0
+TRAIL_ALPHA = 0.6
+TRAIL_LEVELS = 8
+
+ENCODE_PARAMS = {
+    'jpeg': ('.jpg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', cv2.IMWRITE_WEBP_QUALITY)
+}
+
+
+def _load_font(size: int) -> ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype('DejaVuSans-Bold.ttf', size)
+    except OSError:
+        pass
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1: 크기 지정 불가한 비트맵 폰트
+        return ImageFont.load_default()
+
+
+def make_dot_sprite(
+    color: Tuple[int, int, int],
+    radius: float,
+    edge_width: float,
+    alpha: float = DOT_ALPHA,
+    supersample: int = 4
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    흰 테두리가 있는 원형 점 sprite 생성 (anti-aliased)
+
+    Args:
+        color: Face RGB color
+        radius: Outer radius in output pixels
+        edge_width: White edge width in output pixels
+        alpha: Overall opacity
+        supersample: Sub-pixel samples per axis for anti-aliasing
+
+    Returns:
+        (premultiplied_rgb, alpha) float32 arrays of shape (size, size, 3) / (size, size, 1)
+        where size = 2 * ceil(radius) + 1 and the dot is centered.
+    """
+    half = int(np.ceil(radius))
+    size = 2 * half + 1
+    offsets = (np.arange(size * supersample) + 0.5) / supersample - half - 0.5
+    dist = np.hypot(offsets[:, None], offsets[None, :])
+
+    def _coverage(r):
+        covered = (dist <= r).astype(np.float32)
+        return covered.reshape(size, supersample, size, supersample).mean(axis=(1, 3))
+
+    outer = _coverage(radius)
+    inner = _coverage(max(radius - edge_width, 0.0))
+
+    rgb = (
+        inner[..., None] * np.asarray(color, dtype=np.float32)
+        + (outer - inner)[..., None] * np.float32(255)
+    )
+    sprite_alpha = (outer * alpha)[..., None].astype(np.float32)
+    return (rgb * alpha).astype(np.float32), sprite_alpha
+
+
+class FrameRenderer:
+    """
+    Localization 재생용 프레임 렌더러
+
+    인스턴스는 읽기 전용 상태(리사이즈된 지도, sprite, 폰트)만 가지므로
+    여러 세션에서 공유해도 됩니다.
+
+    Args:
+        map_image: Decoded map as an RGB uint8 array (H, W, 3) or PIL image
+        output_width: Width of the rendered frames in pixels (height keeps the map aspect)
+        map_size: (width, height) of the map coordinate system when map_image is already
+            scaled (e.g. map_raster.get_map_raster(output_width)); None = map_image size
+    """
+
+    def __init__(self, map_image, output_width: int = DEFAULT_OUTPUT_WIDTH, map_size: Optional[Tuple[int, int]] = None):
+        map_array = np.asarray(map_image.convert('RGB') if isinstance(map_image, Image.Image) else map_image)
+        self.map_width, self.map_height = map_size or (map_array.shape[1], map_array.shape[0])
+        self.scale = output_width / self.map_width
+        self.width = output_width
+        self.height = int(round(self.map_height * self.scale))
+
+        if map_array.shape[:2] == (self.height, self.width) and not map_array.flags.writeable:
+            # 공유 raster를 그대로 사용 (이미 출력 해상도, 읽기 전용)
+            self.base = map_array
+        else:
+            base = cv2.resize(map_array, (self.width, self.height), interpolation=cv2.INTER_AREA)
+            base.flags.writeable = False
+            self.base = base
+
+        self.sprites = {
+            kind: make_dot_sprite(color, DOT_RADIUS * self.scale, DOT_EDGE_WIDTH * self.scale)
+            for kind, color in DEVICE_COLORS.items()
+        }
+        self.sprite_half = self.sprites['ios'][0].shape[0] // 2
+        self.time_font = _load_font(int(round(TIME_FONT_SIZE * self.scale)))
+        self.count_font = _load_font(int(round(COUNT_FONT_SIZE * self.scale)))
+
+    def _stamp(self, canvas: np.ndarray, x: np.ndarray, y: np.ndarray, kind: str):
+        """sprite를 (x, y) 지도 좌표마다 순서대로 alpha 합성 (source-over)"""
+        sprite_rgb, sprite_alpha = self.sprites[kind]
+        half = self.sprite_half
+        size = 2 * half + 1
+        cols = np.rint(x * self.scale).astype(np.int64) - half
+        rows = np.rint(y * self.scale).astype(np.int64) - half
+        visible = (cols > -size) & (cols < self.width) & (rows > -size) & (rows < self.height)
+
+        for col, row in zip(cols[visible].tolist(), rows[visible].tolist()):
+            c0, r0 = max(col, 0), max(row, 0)
+            c1, r1 = min(col + size, self.width), min(row + size, self.height)
+            sc0, sr0 = c0 - col, r0 - row
+            sc1, sr1 = sc0 + (c1 - c0), sr0 + (r1 - r0)
+
+            region = canvas[r0:r1, c0:c1].astype(np.float32)
+            region *= 1 - sprite_alpha[sr0:sr1, sc0:sc1]
+            region += sprite_rgb[sr0:sr1, sc0:sc1]
+            canvas[r0:r1, c0:c1] = region.astype(np.uint8)
+
+    def _trails(self, canvas: np.ndarray, segments: Tuple[np.ndarray, np.ndarray, np.ndarray], kind: str):
+        """trail 선분을 나이에 따라 옅어지는 선으로 합성 (alpha 마스크에 그린 뒤 한 번에 blend)"""
+        start_xy, end_xy, age = segments
+        if len(age) == 0:
+            return
+        points = np.rint(np.stack([start_xy, end_xy], axis=1) * self.scale).astype(np.int32)
+        c0, r0 = np.maximum(points.reshape(-1, 2).min(axis=0) - 2, 0)
+        c1, r1 = np.minimum(points.reshape(-1, 2).max(axis=0) + 3, (self.width, self.height))
+        if c0 >= c1 or r0 >= r1:
+            return
+        points -= np.array([c0, r0], dtype=np.int32)
+
+        mask = np.zeros((r1 - r0, c1 - c0), dtype=np.uint8)
+        thickness = max(int(round(TRAIL_WIDTH * self.scale)), 1)
+        levels = np.minimum((age * TRAIL_LEVELS).astype(np.int64), TRAIL_LEVELS - 1)
+        # 오래된 단계부터 그려 겹치는 곳은 최신 선분이 위에 오도록 함
+        for level in range(TRAIL_LEVELS - 1, -1, -1):
+            selected = points[levels == level]
+            if len(selected):
+                value = int(255 * TRAIL_ALPHA * (1 - level / TRAIL_LEVELS))
+                cv2.polylines(mask, selected, False, value, thickness, cv2.LINE_AA)
+
+        # per-pixel alpha blend (OpenCV, float 중간 배열 없이)
+        weight = mask.astype(np.float32) / 255
+        region = np.ascontiguousarray(canvas[r0:r1, c0:c1])
+        color = np.empty_like(region)
+        color[:] = DEVICE_COLORS[kind]
+        canvas[r0:r1, c0:c1] = cv2.blendLinear(region, color, 1 - weight, weight)
+
+    def _label(self, canvas: np.ndarray, text: str, font, anchor_x: int, align: str = 'left'):
+        """검은 반투명 둥근 박스 + 흰 글자 (matplotlib bbox boxstyle='round' 대체)"""
+        left, top, right, bottom = font.getbbox(text)
+        pad = int(round(LABEL_PADDING * self.scale))
+        box_w = right - left + 2 * pad
+        box_h = bottom - top + 2 * pad
+        x0 = anchor_x if align == 'left' else anchor_x - box_w
+        y0 = int(round(LABEL_MARGIN * self.scale))
+        x0 = min(max(x0, 0), max(self.width - box_w, 0))
+        box_w = min(box_w, self.width - x0)
+        box_h = min(box_h, self.height - y0)
+
+        label = Image.new('L', (box_w, box_h), 0)
+        draw = ImageDraw.Draw(label)
+        draw.rounded_rectangle((0, 0, box_w - 1, box_h - 1), radius=pad, fill=int(255 * LABEL_ALPHA))
+        mask = np.asarray(label, dtype=np.float32)[..., None] / 255
+
+        text_img = Image.new('L', (box_w, box_h), 0)
+        ImageDraw.Draw(text_img).text((pad - left, pad - top), text, font=font, fill=255)
+        text_mask = np.asarray(text_img, dtype=np.float32)[..., None] / 255
+
+        region = canvas[y0:y0 + box_h, x0:x0 + box_w].astype(np.float32)
+        region *= 1 - mask
+        region += (255 - region) * text_mask
+        canvas[y0:y0 + box_h, x0:x0 + box_w] = region.astype(np.uint8)
+
+    def render(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        is_ios: np.ndarray,
+        time_label: Optional[str] = None,
+        count_label: Optional[str] = None,
+        trails: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+    ) -> np.ndarray:
+        """
+        한 프레임 렌더링
+
+        Args:
+            x, y: Device positions in map pixel coordinates
+            is_ios: Boolean mask, True for randomized (iOS) MAC addresses
+            time_label: Text drawn top-left (e.g. '09:30')
+            count_label: Text drawn top-right (e.g. 'iOS 3 / Android 5 / Total 8')
+            trails: Optional trail segments per kind (TrailBuffer.segments), drawn under the dots
+
+        Returns:
+            RGB uint8 array (height, width, 3)
+        """
+        canvas = self.base.copy()
+        if trails:
+            for kind in DEVICE_COLORS:
+                if kind in trails:
+                    self._trails(canvas, trails[kind], kind)
+
+        x = np.asarray(x, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+        is_ios = np.asarray(is_ios, dtype=bool)
+
+        # matplotlib과 같은 순서: iOS 먼저, Android가 위에
+        self._stamp(canvas, x[is_ios], y[is_ios], 'ios')
+        self._stamp(canvas, x[~is_ios], y[~is_ios], 'android')
+
+        if time_label:
+            self._label(canvas, time_label, self.time_font, int(round(LABEL_MARGIN * self.scale)))
+        if count_label:
+            self._label(
+                canvas, count_label, self.count_font,
+                self.width - int(round(LABEL_MARGIN * self.scale)), align='right'
+            )
+        return canvas
+
+    def render_positions(
+        self,
+        frame: Dict[str, np.ndarray],
+        time_index: int,
+        trails: Optional[Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]] = None
+    ) -> np.ndarray:
+        """
+        Localization 프레임 렌더링 (시각 + iOS / Android / Total 라벨 포함)
+
+        Args:
+            frame: Dict with x, y, is_ios arrays (e.g. position_index.get_frame)
+            time_index: time_index of the frame
+            trails: Optional trail segments (TrailBuffer.segments)
+
+        Returns:
+            RGB uint8 array (height, width, 3)
+        """
+        ios_count = int(np.count_nonzero(frame['is_ios']))
+        total_count = len(frame['is_ios'])
+        return self.render(
+            frame['x'],
+            frame['y'],
+            frame['is_ios'],
+            time_label=time_index_to_time(time_index),
+            count_label=f"iOS {ios_count} / Android {total_count - ios_count} / Total {total_count}",
+            trails=trails
+        )
+
+    def encode(self, frame: np.ndarray, fmt: str = 'jpeg', quality: int = 85) -> bytes:
+        """RGB 프레임 → JPEG / WebP bytes"""
+        ext, quality_flag = ENCODE_PARAMS[fmt]
+        ok, buf = cv2.imencode(ext, cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), [quality_flag, quality])
+        if not ok:
+            raise ValueError(f"Failed to encode frame as {fmt}")
+        return buf.tobytes()
+
+    def render_bytes(self, x, y, is_ios, time_label=None, count_label=None, fmt: str = 'jpeg', quality: int = 85) -> bytes:
+        """render + encode"""
+        return self.encode(self.render(x, y, is_ios, time_label, count_label), fmt=fmt, quality=quality)
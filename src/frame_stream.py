@@ -0,0 +1,170 @@
+"""
+Streaming Frame Source
+긴 재생 구간의 positions를 parquet row group 단위로 읽어 프레임을 하나씩 내보내는 함수들
+
+positions 데이터셋은 time_index 순으로 정렬된 10분(60 슬롯) row group으로 저장되어 있으므로,
+row group의 time_index 통계로 구간 밖 그룹은 건너뛰고 필요한 그룹만 차례로 읽습니다.
+재생 중 메모리에는 row group 하나만 올라가며 (구간 길이와 무관), 첫 프레임은 첫 그룹만 읽고 바로 표시됩니다.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.cache_dataset import (
+    ROW_GROUP_SLOTS,
+    positions_date_dir,
+    positions_source_files,
+    read_positions_table,
+    time_index_to_hour
+)
+from src.cache_schema import classify_randomized_ios
+from src.time_axis import NUM_TIME_SLOTS
+
+
+STREAM_COLUMNS = ['time_index', 'x', 'y', 'is_randomized_ios']
+
+
+def _empty_frame() -> Dict[str, np.ndarray]:
+    return {
+        'x': np.empty(0, dtype=np.float32),
+        'y': np.empty(0, dtype=np.float32),
+        'is_ios': np.empty(0, dtype=bool)
+    }
+
+
+def _chunk_columns(chunk: pd.DataFrame) -> Dict[str, np.ndarray]:
+    if 'is_randomized_ios' in chunk.columns:
+        is_ios = chunk['is_randomized_ios'].to_numpy(dtype=bool)
+    else:
+        is_ios = classify_randomized_ios(chunk['mac_address'])
+    return {
+        'time_index': chunk['time_index'].to_numpy().astype(np.int64),
+        'x': chunk['x'].to_numpy(dtype=np.float32),
+        'y': chunk['y'].to_numpy(dtype=np.float32),
+        'is_ios': is_ios
+    }
+
+
+def iter_position_chunks(date_str: str, start_time_idx: int, end_time_idx: int) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    시간 구간의 positions를 row group 단위로 차례로 읽기 (time_index 오름차순)
+
+    Args:
+        date_str: Date (YYYY-MM-DD)
+        start_time_idx, end_time_idx: Inclusive time_index window
+
+    Yields:
+        Dict of time_index (int64), x, y (float32), is_ios (bool) arrays for one row group,
+        restricted to the window
+    """
+    files = positions_source_files(date_str)
+    if not files:
+        return
+
+    if files[0].parent.parent != positions_date_dir(date_str):
+        # 단일 parquet (정렬 보장 없음): 구간을 한 번에 읽어 한 chunk로
+        table = read_positions_table(date_str, start_time_idx, end_time_idx)
+        if table is not None and table.num_rows:
+            yield _chunk_columns(table.sort_by('time_index').to_pandas())
+        return
+
+    first_hour, last_hour = time_index_to_hour(start_time_idx), time_index_to_hour(end_time_idx)
+    for path in files:
+        hour = int(path.parent.name.split('=')[1])
+        if hour < first_hour or hour > last_hour:
+            continue
+
+        parquet_file = pq.ParquetFile(path, read_dictionary=['mac_address'])
+        names = parquet_file.schema_arrow.names
+        columns = [c for c in STREAM_COLUMNS if c in names]
+        if 'is_randomized_ios' not in columns:
+            columns.append('mac_address')
+        time_col = names.index('time_index')
+
+        for group in range(parquet_file.num_row_groups):
+            stats = parquet_file.metadata.row_group(group).column(time_col).statistics
+            if stats is not None and stats.has_min_max and (stats.max < start_time_idx or stats.min > end_time_idx):
+                continue
+            chunk = _chunk_columns(parquet_file.read_row_group(group, columns=columns).to_pandas())
+            in_window = (chunk['time_index'] >= start_time_idx) & (chunk['time_index'] <= end_time_idx)
+            if not in_window.all():
+                chunk = {key: value[in_window] for key, value in chunk.items()}
+            if len(chunk['time_index']):
+                yield chunk
+
+
+def iter_frames(date_str: str, start_time_idx: int, end_time_idx: int) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+    """
+    시간 구간의 프레임을 하나씩 생성 (기기가 있는 time_index만)
+
+    Yields:
+        (time_index, frame) where frame is a dict of x, y, is_ios views into the current row group
+    """
+    for chunk in iter_position_chunks(date_str, start_time_idx, end_time_idx):
+        time_index = chunk['time_index']
+        bounds = np.flatnonzero(np.diff(time_index)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(time_index)]])
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            yield int(time_index[start]), {
+                'x': chunk['x'][start:end],
+                'y': chunk['y'][start:end],
+                'is_ios': chunk['is_ios'][start:end]
+            }
+
+
+def stream_frame_times(date_str: str, start_time_idx: int, end_time_idx: int) -> np.ndarray:
+    """
+    구간 안에서 기기가 있는 time_index 목록 (time_index 컬럼만 읽음)
+    """
+    table = read_positions_table(date_str, start_time_idx, end_time_idx, columns=['time_index'])
+    if table is None or table.num_rows == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(table['time_index'].to_numpy().astype(np.int64))
+
+
+class FrameStream:
+    """
+    재생 위치를 따라가는 프레임 스트림
+
+    앞으로 재생하는 동안에는 같은 generator에서 다음 프레임을 꺼내고,
+    뒤로 이동하거나 row group 하나 이상 건너뛰면 그 시각부터 generator를 다시 엽니다.
+
+    Args:
+        date_str: Date (YYYY-MM-DD)
+        start_time_idx, end_time_idx: Inclusive time_index window
+    """
+
+    def __init__(self, date_str: str, start_time_idx: int, end_time_idx: int):
+        self.date_str = date_str
+        self.start_time_idx = max(int(start_time_idx), 1)
+        self.end_time_idx = min(int(end_time_idx), NUM_TIME_SLOTS)
+        self.frame_times = stream_frame_times(date_str, self.start_time_idx, self.end_time_idx)
+        self._frames: Optional[Iterator] = None
+        self._current: Optional[Tuple[int, Dict[str, np.ndarray]]] = None
+
+    def frame(self, time_index: int) -> Dict[str, np.ndarray]:
+        """
+        time_index의 기기 위치
+
+        Returns:
+            Dict with x, y, is_ios arrays (empty if no device at time_index)
+        """
+        time_index = int(time_index)
+        if (
+            self._frames is None
+            or (self._current is not None and time_index < self._current[0])
+            or (self._current is not None and time_index - self._current[0] > ROW_GROUP_SLOTS)
+        ):
+            self._frames = iter_frames(self.date_str, max(time_index, self.start_time_idx), self.end_time_idx)
+            self._current = None
+
+        while self._current is None or self._current[0] < time_index:
+            next_frame = next(self._frames, None)
+            if next_frame is None:
+                self._frames = None
+                return _empty_frame()
+            self._current = next_frame
+
+        return self._current[1] if self._current[0] == time_index else _empty_frame()
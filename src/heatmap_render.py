@@ -0,0 +1,391 @@
+"""
+Heatmap Image Rendering
+Heatmap 페이지의 누적 heatmap PNG를 그리고, 결과를 디스크에 내용 주소(content-addressed)로 캐시하는 함수들
+
+캐시 키는 (날짜, 시간 구간, 제목, sigma, colormap, 지도 버전, 원본 데이터 버전, 렌더러 버전)의 해시이므로
+같은 구간을 다시 요청하면 세션/재시작과 무관하게 저장된 PNG를 바로 돌려주고,
+지도나 원본이 바뀌면 키가 달라져 예전 이미지는 쓰이지 않습니다.
+캐시 디렉토리 전체 크기가 예산(DEEPCOMMERCE_HEATMAP_CACHE_MB, 기본 256MB)을 넘으면
+가장 오래 사용되지 않은 파일부터 지웁니다 (읽을 때 mtime을 갱신).
+
+고정 구간 이미지(Data/Cache/Heatmap/heatmap_{date}_{period}.png)는 같은 렌더러로
+여러 프로세스에서 미리 생성하며, PNG 메타데이터에 캐시 키를 기록해 입력이 그대로인 이미지는 건너뜁니다.
+
+Usage:
+    from src.heatmap_render import get_heatmap_png
+    png = get_heatmap_png('2025-10-12', 3241, 3600, 'Custom: 09:00 - 10:00')
+
+    python -m src.heatmap_render                      # all dates x periods, changed inputs only
+    python -m src.heatmap_render --date 2025-10-12 --period morning --overwrite
+"""
+import argparse
+import functools
+import hashlib
+import importlib
+import io
+import json
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from src.heatmap_store import (
+    HEATMAP_PERIODS,
+    available_heatmap_dates,
+    frame_span,
+    heatmap_cumulative_max,
+    heatmap_source_version,
+    heatmap_window,
+    load_heatmap_store,
+    period_window
+)
+from src.map_raster import draw_map, map_image_path
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+RENDER_CACHE_DIR = CACHE_DIR / 'HeatmapRenders'
+HEATMAP_IMAGE_DIR = CACHE_DIR / 'Heatmap'
+DEFAULT_RENDER_CACHE_MB = 256
+
+# 렌더링 파라미터 (Heatmap 페이지 정적 이미지와 동일)
+HEATMAP_SIGMA = 2.0
+HEATMAP_COLORS = ('#00000000', '#ffff00ff', '#ff8c00ff', '#ff0000ff', '#8b0000ff')
+HEATMAP_FIGSIZE = (14, 10)
+HEATMAP_DPI = 100
+# 그리는 방식이 바뀌면 올려서 이전 캐시를 무효화
+RENDER_VERSION = 1
+# 미리 생성한 PNG의 tEXt 메타데이터 키 (render_key 값)
+RENDER_KEY_FIELD = 'heatmap_render_key'
+
+PERIOD_LABELS = {
+    'full': 'Full Day',
+    'morning': 'Morning',
+    'afternoon': 'Afternoon',
+    'evening': 'Evening'
+}
+
+
+def period_title(period_key: str) -> str:
+    """고정 구간 이미지 제목 (예: 'Morning: 06:00 - 12:00')"""
+    return f"{PERIOD_LABELS[period_key]}: {' - '.join(HEATMAP_PERIODS[period_key])}"
+
+
+def heatmap_image_path(date_str: str, period_key: str, image_dir: Path = HEATMAP_IMAGE_DIR) -> Path:
+    return image_dir / f'heatmap_{date_str}_{period_key}.png'
+
+
+@functools.lru_cache(maxsize=8)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def map_version() -> str:
+    """지도 이미지 내용 해시 (지도 파일이 없으면 'none')"""
+    path = map_image_path()
+    if path is None:
+        return 'none'
+    stat = path.stat()
+    return _file_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+
+def render_key(
+    date_str: str,
+    start_time_idx: int,
+    end_time_idx: int,
+    title: str = '',
+    sigma: float = HEATMAP_SIGMA,
+    colors: Sequence[str] = HEATMAP_COLORS
+) -> str:
+    """
+    렌더링 결과 캐시 키 (입력이 모두 같으면 같은 PNG)
+
+    Returns:
+        Hex digest
+    """
+    params = {
+        'date': date_str,
+        'start': int(start_time_idx),
+        'end': int(end_time_idx),
+        'title': title,
+        'sigma': float(sigma),
+        'colormap': list(colors),
+        'figsize': list(HEATMAP_FIGSIZE),
+        'dpi': HEATMAP_DPI,
+        'map': map_version(),
+        'data': heatmap_source_version(date_str),
+        'renderer': RENDER_VERSION
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def render_heatmap_png(
+    store: Dict,
+    start_time_idx: int,
+    end_time_idx: int,
+    title: str = '',
+    sigma: float = HEATMAP_SIGMA,
+    colors: Sequence[str] = HEATMAP_COLORS,
+    metadata: Optional[Dict[str, str]] = None
+) -> bytes:
+    """
+    시간 구간 [start, end] 동안 쌓인 heatmap을 지도 위에 그린 PNG
+
+    Args:
+        store: Dict from load_heatmap_store
+        start_time_idx, end_time_idx: Inclusive time_index window
+        title: Text drawn at the top-left (empty = none)
+        sigma: Gaussian smoothing in map pixels
+        colors: Colormap stops (RGBA hex), low → high
+        metadata: Extra PNG text chunks
+
+    Returns:
+        PNG bytes
+    """
+    # pyplot 전역 상태를 쓰지 않는 Figure (Streamlit 스레드 / 워커 프로세스에서 안전)
+    from matplotlib.figure import Figure
+    from matplotlib.colors import LinearSegmentedColormap
+    from scipy.ndimage import gaussian_filter
+
+    heatmap_diff = heatmap_window(store, start_time_idx, end_time_idx).astype(float)
+    cumulative_max = heatmap_cumulative_max(store, end_time_idx)
+
+    fig = Figure(figsize=HEATMAP_FIGSIZE, dpi=HEATMAP_DPI)
+    ax = fig.subplots()
+    draw_map(ax)
+
+    cmap = LinearSegmentedColormap.from_list('custom_heat', list(colors), N=256)
+
+    heatmap_display = gaussian_filter(heatmap_diff, sigma=sigma)
+    max_val = np.max(heatmap_display)
+    if max_val > 0:
+        heatmap_display = np.sqrt(heatmap_display / max_val) * max_val
+    heatmap_display[heatmap_display == 0] = np.nan
+
+    ax.imshow(heatmap_display, cmap=cmap, alpha=0.8, vmin=0, vmax=cumulative_max if cumulative_max > 0 else 1)
+
+    if title:
+        ax.text(10, 30, title,
+               fontsize=18, color='white',
+               bbox=dict(boxstyle='round', facecolor='black', alpha=0.7), weight='bold')
+
+    ax.axis('off')
+    fig.tight_layout(pad=0)
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', bbox_inches='tight', pad_inches=0, metadata=metadata)
+    return buf.getvalue()
+
+
+def _render_cache_budget() -> int:
+    return int(float(os.environ.get('DEEPCOMMERCE_HEATMAP_CACHE_MB', DEFAULT_RENDER_CACHE_MB)) * 1024 * 1024)
+
+
+def evict_render_cache(budget_bytes: Optional[int] = None) -> int:
+    """
+    캐시 디렉토리가 예산을 넘으면 가장 오래 사용되지 않은 PNG부터 삭제
+
+    Returns:
+        Number of files removed
+    """
+    budget_bytes = _render_cache_budget() if budget_bytes is None else budget_bytes
+    entries = []
+    for path in RENDER_CACHE_DIR.glob('*.png'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue  # 다른 프로세스가 이미 삭제
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    removed = 0
+    total = 0
+    for _, size, path in sorted(entries, reverse=True):
+        total += size
+        if total > budget_bytes:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def get_heatmap_png(
+    date_str: str,
+    start_time_idx: int,
+    end_time_idx: int,
+    title: str = '',
+    sigma: float = HEATMAP_SIGMA,
+    colors: Sequence[str] = HEATMAP_COLORS
+) -> Optional[bytes]:
+    """
+    시간 구간 heatmap PNG (디스크 캐시에 있으면 바로, 없으면 렌더링 후 저장)
+
+    Returns:
+        PNG bytes, or None if the date has no heatmap data or the window has no frames
+    """
+    path = RENDER_CACHE_DIR / f'{render_key(date_str, start_time_idx, end_time_idx, title, sigma, colors)}.png'
+    try:
+        png = path.read_bytes()
+    except OSError:
+        png = None
+    if png is not None:
+        try:
+            os.utime(path)  # LRU 순서 갱신
+        except OSError:
+            pass
+        return png
+
+    store = load_heatmap_store(date_str)
+    if store is None:
+        return None
+    first, stop = frame_span(store, start_time_idx, end_time_idx)
+    if stop == first:
+        return None
+
+    png = render_heatmap_png(store, start_time_idx, end_time_idx, title, sigma, colors)
+    try:
+        RENDER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.stem}.{os.getpid()}.tmp')
+        tmp_path.write_bytes(png)
+        os.replace(tmp_path, path)
+        evict_render_cache()
+    except OSError:
+        pass  # 읽기 전용 배포 환경에서는 저장하지 않음
+    return png
+
+
+def _stored_render_key(path: Path) -> Optional[str]:
+    """미리 생성한 PNG에 기록된 캐시 키 (없거나 읽을 수 없으면 None)"""
+    from PIL import Image
+
+    try:
+        with Image.open(path) as image:
+            return image.text.get(RENDER_KEY_FIELD)
+    except (OSError, ValueError):
+        return None
+
+
+def _init_worker():
+    # matplotlib / scipy import를 이미지별 시간에서 제외
+    for module in ('matplotlib.figure', 'matplotlib.colors', 'scipy.ndimage'):
+        importlib.import_module(module)
+
+
+def _render_period_image(date_str: str, period_key: str, key: str, path: str) -> float:
+    """워커: (날짜, 구간) 이미지 하나를 렌더링해 저장하고 걸린 시간(초)을 반환"""
+    start = time.perf_counter()
+    start_time_idx, end_time_idx = period_window(period_key)
+    png = render_heatmap_png(
+        load_heatmap_store(date_str),
+        start_time_idx,
+        end_time_idx,
+        period_title(period_key),
+        metadata={RENDER_KEY_FIELD: key}
+    )
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.stem}.{os.getpid()}.tmp.png')
+    tmp_path.write_bytes(png)
+    tmp_path.replace(path)
+    return time.perf_counter() - start
+
+
+def pregenerate_heatmaps(
+    dates: Optional[List[str]] = None,
+    periods: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    overwrite: bool = False,
+    image_dir: Path = HEATMAP_IMAGE_DIR
+) -> Iterator[Dict]:
+    """
+    고정 구간 heatmap 이미지를 (날짜 × 구간)별로 여러 프로세스에서 생성
+
+    저장된 PNG의 캐시 키가 현재 입력(지도, 원본, colormap 등)의 키와 같으면 건너뜁니다.
+    캐시 키가 없는 기존 PNG (예: 저장소에 포함된 이미지)는 입력을 알 수 없으므로 overwrite일 때만 다시 그립니다.
+    증분 저장소는 워커가 동시에 만들지 않도록 메인 프로세스에서 먼저 준비합니다.
+
+    Args:
+        dates: Dates to render (default: every date with heatmap data)
+        periods: HEATMAP_PERIODS keys (default: all)
+        max_workers: Render processes (default: CPU count)
+        overwrite: Re-render even if the stored key matches or the image has no key
+        image_dir: Output directory
+
+    Yields:
+        Dict with date, period, path,
+        status ('rendered' | 'up to date' | 'unknown' | 'no data' | 'no source'),
+        seconds (render time, 0 if skipped), in completion order
+    """
+    dates = available_heatmap_dates() if dates is None else dates
+    periods = list(HEATMAP_PERIODS) if periods is None else periods
+
+    tasks = []
+    for date_str in dates:
+        store = load_heatmap_store(date_str)
+        for period_key in periods:
+            path = heatmap_image_path(date_str, period_key, image_dir)
+            result = {'date': date_str, 'period': period_key, 'path': path, 'seconds': 0.0}
+            if store is None:
+                yield {**result, 'status': 'no source'}
+                continue
+            first, stop = frame_span(store, *period_window(period_key))
+            if stop == first:
+                yield {**result, 'status': 'no data'}
+                continue
+            key = render_key(date_str, *period_window(period_key), period_title(period_key))
+            if not overwrite and path.exists():
+                stored_key = _stored_render_key(path)
+                if stored_key == key:
+                    yield {**result, 'status': 'up to date'}
+                    continue
+                if stored_key is None:
+                    # 이 CLI가 만들지 않은 이미지 (출처/입력을 알 수 없음): 오래된 것으로 보지 않음
+                    yield {**result, 'status': 'unknown'}
+                    continue
+            tasks.append((result, key))
+
+    if not tasks:
+        return
+
+    image_dir.mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_render_period_image, result['date'], result['period'], key, str(result['path'])): result
+            for result, key in tasks
+        }
+        for future in as_completed(futures):
+            yield {**futures[future], 'status': 'rendered', 'seconds': future.result()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-generate static heatmap images for every date and period')
+    parser.add_argument('--date', action='append', default=None, help='YYYY-MM-DD (repeatable, default: all dates)')
+    parser.add_argument('--period', action='append', choices=list(HEATMAP_PERIODS), default=None,
+                        help='repeatable (default: all periods)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--overwrite', action='store_true',
+                        help='re-render even if inputs are unchanged or the existing image has no render key')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = {}
+    render_seconds = 0.0
+    for result in pregenerate_heatmaps(args.date, args.period, args.workers, args.overwrite):
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        render_seconds += result['seconds']
+        timing = f" in {result['seconds']:.2f} s" if result['status'] == 'rendered' else ''
+        print(f"{result['date']} {result['period']:<9}: {result['status']}{timing}")
+
+    elapsed = time.perf_counter() - start
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Done in {elapsed:.1f} s ({summary or 'nothing to do'}; {render_seconds:.1f} s of rendering)")
+    if counts.get('unknown'):
+        print(f"{counts['unknown']} existing image(s) have no render key and were kept; use --overwrite to regenerate them")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,391 @@
+"""
+Delta-encoded Heatmap Store
+누적 heatmap을 프레임별 희소 증분(CSR)으로 저장/복원하는 함수들
+
+기존 heatmap_cumulative_{date}.npz는 프레임마다 H×W 전체 누적 배열을 저장했지만,
+인접 프레임 사이에 바뀌는 픽셀은 극히 일부입니다. 여기서는 프레임 i의 증분
+(cumulative[i] - cumulative[i - 1])에서 0이 아닌 픽셀만 (pixel, value)로 저장하고,
+프레임 i의 증분은 pixels[offsets[i]:offsets[i + 1]] 입니다.
+
+    cumulative[i]                 = 증분 0..i 의 합
+    cumulative[i1] - cumulative[i0] = 증분 i0+1..i1 의 합
+
+정수 count(positions로 만든 저장소, 정수 dense stack)는 정확히 복원되고 음수가 없습니다.
+float dense stack은 증분을 다시 더하므로 반올림 오차(float32 기준 상대 오차 ~1e-7)가 남습니다.
+
+임의 시간 구간은 time_indices에 대한 searchsorted로 프레임 범위를 찾고
+(heatmap_window), 고정 구간은 HEATMAP_PERIODS / period_window로 정의합니다.
+프레임별 누적 최댓값(cumulative_max, 색상 범위용)은 저장소를 만들 때 한 번 계산해 두고
+searchsorted로 조회하므로 (heatmap_cumulative_max), 하루 시작부터의 증분을 다시 읽지 않습니다.
+
+저장소는 heatmap_deltas_{date}/ 디렉토리의 raw .npy 파일들이며 mmap_mode='r'로 열어,
+프레임/구간을 조회할 때 해당 증분 행의 페이지만 읽습니다 (압축 해제나 전체 로드 없음).
+기존 dense 파일이 있으면 그것을 변환하고 없으면 positions 캐시로부터
+(기기 위치 픽셀별 관측 수) 생성합니다.
+
+Usage:
+    python -m src.heatmap_store                    # 모든 날짜 변환/생성
+    python -m src.heatmap_store --date 2025-10-12
+"""
+import argparse
+import shutil
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.cache_dataset import POSITIONS_DATASET_DIR, positions_source_files
+from src.data_cache import per_date_cache
+from src.map_raster import get_map_size
+from src.position_index import load_position_index
+from src.time_axis import time_to_time_index
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+STORE_KEYS = ('time_indices', 'offsets', 'pixels', 'values', 'shape', 'cumulative_max')
+
+# Heatmap 페이지의 고정 구간 (시작 포함, 끝 미포함)
+HEATMAP_PERIODS = {
+    'full': ('06:00', '22:00'),
+    'morning': ('06:00', '12:00'),
+    'afternoon': ('12:00', '18:00'),
+    'evening': ('18:00', '22:00')
+}
+
+
+def dense_heatmap_path(date_str: str) -> Path:
+    return CACHE_DIR / f'heatmap_cumulative_{date_str}.npz'
+
+
+def heatmap_store_path(date_str: str) -> Path:
+    return CACHE_DIR / f'heatmap_deltas_{date_str}'
+
+
+def _source_files(date_str: str) -> List[Path]:
+    dense_file = dense_heatmap_path(date_str)
+    return [dense_file] if dense_file.exists() else positions_source_files(date_str)
+
+
+def _source_mtimes(source_files) -> np.ndarray:
+    return np.array([f.stat().st_mtime for f in source_files])
+
+
+def heatmap_source_version(date_str: str) -> str:
+    """
+    heatmap 원본 버전 문자열 (원본 파일 이름 + mtime; 저장소만 배포된 경우 저장된 mtime)
+
+    렌더링 결과 캐시 키에 넣어 원본이 바뀌면 이전 이미지가 쓰이지 않게 합니다.
+    """
+    source_files = _source_files(date_str)
+    if source_files:
+        return ';'.join(f'{f.name}:{f.stat().st_mtime}' for f in source_files)
+    mtimes_file = heatmap_store_path(date_str) / 'source_mtimes.npy'
+    if mtimes_file.exists():
+        return ';'.join(str(m) for m in np.load(mtimes_file))
+    return ''
+
+
+def build_store_from_dense(cumulative_heatmaps: np.ndarray, time_indices: np.ndarray) -> Dict:
+    """
+    dense 누적 heatmap stack → 증분 저장소 (정수 stack은 정확히 복원, float은 반올림 오차 내)
+
+    Args:
+        cumulative_heatmaps: (n_frames, H, W) cumulative counts
+        time_indices: (n_frames,) time_index of each frame, ascending
+
+    Returns:
+        Dict with:
+        - time_indices: int64 (n_frames,)
+        - offsets: int64 (n_frames + 1,); increments of frame i are rows offsets[i]:offsets[i + 1]
+        - pixels: int32 flat pixel index (row * W + col)
+        - values: increments, same dtype as the dense stack
+        - shape: int64 (H, W)
+        - cumulative_max: (n_frames,) max pixel of cumulative[i], same dtype as values
+    """
+    n_frames, height, width = cumulative_heatmaps.shape
+    offsets = np.zeros(n_frames + 1, dtype=np.int64)
+    pixels, values = [], []
+    cumulative_max = np.zeros(n_frames, dtype=cumulative_heatmaps.dtype)
+    previous = np.zeros(height * width, dtype=cumulative_heatmaps.dtype)
+    # 프레임 하나씩 차분해서 dense stack 전체 복사본을 만들지 않음
+    for i in range(n_frames):
+        current = np.asarray(cumulative_heatmaps[i]).ravel()
+        changed = np.flatnonzero(current != previous)
+        pixels.append(changed.astype(np.int32))
+        values.append(current[changed] - previous[changed])
+        offsets[i + 1] = offsets[i] + len(changed)
+        cumulative_max[i] = current.max()
+        previous = current
+
+    return {
+        'time_indices': np.asarray(time_indices, dtype=np.int64),
+        'offsets': offsets,
+        'pixels': np.concatenate(pixels) if pixels else np.empty(0, dtype=np.int32),
+        'values': np.concatenate(values) if values else np.empty(0, dtype=cumulative_heatmaps.dtype),
+        'shape': np.array([height, width], dtype=np.int64),
+        'cumulative_max': cumulative_max
+    }
+
+
+def build_store_from_positions(position_index: Dict, map_size) -> Dict:
+    """
+    프레임 인덱스 → 증분 저장소 (time slot별 기기 위치 픽셀의 관측 수)
+
+    Args:
+        position_index: Dict from position_index.load_position_index
+        map_size: (width, height) of the map pixel grid
+
+    Returns:
+        Dict with the same keys as build_store_from_dense (values: int32 counts),
+        one frame per time_index with data
+    """
+    width, height = map_size
+    position_offsets = position_index['offsets']
+    counts = np.diff(position_offsets)
+    time_index = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+
+    cols = np.clip(position_index['x'].astype(np.int64), 0, width - 1)
+    rows = np.clip(position_index['y'].astype(np.int64), 0, height - 1)
+    keys = time_index * (height * width) + rows * width + cols
+    unique_keys, key_counts = np.unique(keys, return_counts=True)
+
+    key_times = unique_keys // (height * width)
+    time_indices = np.unique(key_times)
+    store = {
+        'time_indices': time_indices,
+        'offsets': np.append(np.searchsorted(key_times, time_indices), len(unique_keys)),
+        'pixels': (unique_keys % (height * width)).astype(np.int32),
+        'values': key_counts.astype(np.int32),
+        'shape': np.array([height, width], dtype=np.int64)
+    }
+    store['cumulative_max'] = compute_cumulative_max(store)
+    return store
+
+
+def compute_cumulative_max(store: Dict) -> np.ndarray:
+    """
+    프레임별 누적 heatmap의 최댓값 (cumulative[i].max()), 증분을 한 번만 순회
+
+    음수 증분이 없으면 누적값은 증분이 있는 픽셀에서만 커지므로
+    바뀐 픽셀의 최댓값과 이전 프레임 최댓값만 비교합니다.
+
+    Returns:
+        (n_frames,) array, same dtype as store['values']
+    """
+    height, width = (int(v) for v in store['shape'])
+    offsets = store['offsets']
+    pixels, values = store['pixels'], store['values']
+    n_frames = len(offsets) - 1
+    cumulative = np.zeros(height * width, dtype=values.dtype)
+    cumulative_max = np.zeros(n_frames, dtype=values.dtype)
+    monotone = len(values) == 0 or values.min() >= 0
+    running = cumulative.dtype.type(0)
+    for i in range(n_frames):
+        start, end = offsets[i], offsets[i + 1]
+        changed = pixels[start:end]
+        # 프레임 안에서 픽셀은 중복되지 않음
+        cumulative[changed] += values[start:end]
+        if not monotone:
+            running = cumulative.max()
+        elif end > start:
+            running = max(running, cumulative[changed].max())
+        cumulative_max[i] = running
+    return cumulative_max
+
+
+def save_heatmap_store(store: Dict, store_dir: Path, source_mtimes: np.ndarray):
+    """
+    저장소를 raw .npy 디렉토리로 저장 (임시 디렉토리에 쓴 뒤 교체)
+    """
+    tmp_dir = store_dir.with_name(store_dir.name + '.tmp')
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir(parents=True)
+    for key in STORE_KEYS:
+        np.save(tmp_dir / f'{key}.npy', store[key])
+    np.save(tmp_dir / 'source_mtimes.npy', source_mtimes)
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    tmp_dir.rename(store_dir)
+
+
+def open_heatmap_store(store_dir: Path) -> Optional[Dict]:
+    """
+    저장소 디렉토리를 memory-map으로 열기 (읽기 전용, 페이지는 접근할 때 로드)
+
+    Returns:
+        Dict of np.memmap arrays (shape is loaded in memory), or None if incomplete
+    """
+    keys = [key for key in STORE_KEYS if key != 'cumulative_max']
+    if not all((store_dir / f'{key}.npy').exists() for key in keys):
+        return None
+    store = {key: np.load(store_dir / f'{key}.npy', mmap_mode='r') for key in keys}
+    store['shape'] = np.array(store['shape'])
+
+    max_file = store_dir / 'cumulative_max.npy'
+    if max_file.exists():
+        store['cumulative_max'] = np.load(max_file, mmap_mode='r')
+    else:
+        # cumulative_max 이전에 만든 저장소: 한 번 계산해서 함께 저장
+        store['cumulative_max'] = compute_cumulative_max(store)
+        try:
+            np.save(max_file, store['cumulative_max'])
+        except OSError:
+            pass
+    return store
+
+
+def _build_store(date_str: str) -> Optional[Dict]:
+    dense_file = dense_heatmap_path(date_str)
+    if dense_file.exists():
+        with np.load(dense_file) as data:
+            return build_store_from_dense(data['cumulative_heatmaps'], data['time_indices'])
+    position_index = load_position_index(date_str)
+    if position_index is None:
+        return None
+    return build_store_from_positions(position_index, get_map_size())
+
+
+@per_date_cache
+def load_heatmap_store(date_str: str) -> Optional[Dict]:
+    """
+    날짜별 heatmap 증분 저장소 로드 (없거나 원본보다 오래되었으면 생성 후 저장)
+
+    Returns:
+        Dict from build_store_from_dense / build_store_from_positions,
+        or None if the date has neither a dense heatmap cache nor positions
+    """
+    source_files = _source_files(date_str)
+    store_dir = heatmap_store_path(date_str)
+    mtimes_file = store_dir / 'source_mtimes.npy'
+
+    if mtimes_file.exists() and (
+        # 원본 없이 저장소만 배포된 경우에도 사용
+        not source_files or np.array_equal(np.load(mtimes_file), _source_mtimes(source_files))
+    ):
+        store = open_heatmap_store(store_dir)
+        if store is not None:
+            return store
+
+    if not source_files:
+        return None
+    store = _build_store(date_str)
+    if store is None:
+        return None
+
+    try:
+        save_heatmap_store(store, store_dir, _source_mtimes(source_files))
+    except OSError:
+        return store  # 읽기 전용 배포 환경에서는 메모리에서 사용
+    return open_heatmap_store(store_dir)
+
+
+def heatmap_between(store: Dict, from_frame: int, to_frame: int) -> np.ndarray:
+    """
+    cumulative[to_frame] - cumulative[from_frame] (from_frame = -1이면 누적 전체)
+
+    offsets가 프레임 증분 수의 prefix sum이므로 두 프레임의 차이는
+    연속된 증분 행 구간 하나이며, bincount 한 번으로 복원됩니다 (정수 count는 정확, 음수 없음).
+
+    Args:
+        store: Dict from load_heatmap_store
+        from_frame, to_frame: Frame positions (not time_index), from_frame <= to_frame
+
+    Returns:
+        (H, W) array of the increments in frames from_frame+1 .. to_frame
+    """
+    height, width = (int(v) for v in store['shape'])
+    start = store['offsets'][from_frame + 1]
+    end = store['offsets'][to_frame + 1]
+    flat = np.bincount(
+        store['pixels'][start:end],
+        weights=store['values'][start:end],
+        minlength=height * width
+    )
+    return flat.astype(store['values'].dtype, copy=False).reshape(height, width)
+
+
+def frame_span(store: Dict, start_time_idx: int, end_time_idx: int) -> Tuple[int, int]:
+    """
+    time_index 구간 [start, end]에 속하는 프레임 범위 (searchsorted)
+
+    Returns:
+        (first, stop): frames first .. stop - 1 fall inside the window (first == stop if none)
+    """
+    time_indices = store['time_indices']
+    first = int(np.searchsorted(time_indices, start_time_idx, side='left'))
+    stop = int(np.searchsorted(time_indices, end_time_idx, side='right'))
+    return first, max(stop, first)
+
+
+def heatmap_window(store: Dict, start_time_idx: int, end_time_idx: int) -> np.ndarray:
+    """
+    time_index 구간 [start, end] (양 끝 포함) 동안 쌓인 heatmap
+
+    = cumulative[end] - cumulative[start - 1] (기존 target/baseline 프레임 차이와 동일)
+
+    Args:
+        store: Dict from load_heatmap_store
+        start_time_idx, end_time_idx: Inclusive time_index window
+
+    Returns:
+        (H, W) array
+    """
+    first, stop = frame_span(store, start_time_idx, end_time_idx)
+    return heatmap_between(store, first - 1, stop - 1)
+
+
+def heatmap_cumulative_max(store: Dict, end_time_idx: int):
+    """
+    time_index end까지 쌓인 누적 heatmap의 최댓값 (= heatmap_window(store, 1, end).max())
+
+    빌드 시 계산한 프레임별 최댓값을 searchsorted로 조회합니다.
+
+    Returns:
+        Scalar of store['values'] dtype (0 if no frame is at or before end)
+    """
+    stop = int(np.searchsorted(store['time_indices'], end_time_idx, side='right'))
+    if stop == 0:
+        return store['cumulative_max'].dtype.type(0)
+    return store['cumulative_max'][stop - 1]
+
+
+def period_window(period_key: str) -> Tuple[int, int]:
+    """HEATMAP_PERIODS 키 → 양 끝 포함 time_index 구간 (예: 'morning' → 06:00 ~ 11:59:50)"""
+    start, end = HEATMAP_PERIODS[period_key]
+    return time_to_time_index(start), time_to_time_index(end) - 1
+
+
+def available_heatmap_dates() -> List[str]:
+    """dense heatmap / 증분 저장소 / positions 중 하나라도 있는 날짜"""
+    dates = {f.stem.replace('heatmap_cumulative_', '') for f in CACHE_DIR.glob('heatmap_cumulative_*.npz')}
+    dates.update(
+        d.name.replace('heatmap_deltas_', '') for d in CACHE_DIR.glob('heatmap_deltas_*')
+        if d.is_dir() and not d.name.endswith('.tmp')
+    )
+    dates.update(d.name.replace('date=', '') for d in POSITIONS_DATASET_DIR.glob('date=*') if d.is_dir())
+    dates.update(f.stem.replace('positions_', '') for f in CACHE_DIR.glob('positions_*.parquet'))
+    return sorted(dates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build delta-encoded heatmap stores')
+    parser.add_argument('--date', default=None, help='YYYY-MM-DD (default: all dates)')
+    args = parser.parse_args()
+
+    for date_str in [args.date] if args.date else available_heatmap_dates():
+        store = load_heatmap_store(date_str)
+        if store is None:
+            print(f"{date_str}: no heatmap source")
+            continue
+        height, width = (int(v) for v in store['shape'])
+        dense_bytes = len(store['time_indices']) * height * width * store['values'].itemsize
+        stored_bytes = sum(f.stat().st_size for f in heatmap_store_path(date_str).glob('*.npy'))
+        print(
+            f"{date_str}: {len(store['time_indices'])} frames, {len(store['pixels']):,} increments, "
+            f"{stored_bytes / 1e6:.2f} MB on disk (dense stack {dense_bytes / 1e9:.2f} GB)"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Shared Map Raster
+지도 배경(Data/Map/map_image.png)을 한 번만 디코딩해 모든 렌더러가 공유하는 함수들
+
+원본 해상도의 RGB uint8 배열과, 실제로 쓰는 표시 폭별로 미리 리사이즈한 배열을
+프로세스당 한 번씩 만들어 두고 읽기 전용 배열로 돌려줍니다.
+프레임 렌더러(Localization 재생 / 영상)는 출력 폭의 배열을 그대로 쓰고,
+matplotlib 페이지는 draw_map으로 디코딩된 원본 배열을 그립니다
+(matplotlib은 어차피 축 크기로 다시 리샘플링하므로 미리 키운 배열은 오히려 느림).
+"""
+import threading
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MAP_DIR = PROJECT_ROOT / 'Data' / 'Map'
+MAP_CANDIDATES = ('map_image.png', 'map.png')
+
+# 지도 파일이 없을 때의 흰 배경 크기
+DEFAULT_MAP_SIZE = (696, 509)
+
+_lock = threading.Lock()
+_rasters: Dict[Optional[int], np.ndarray] = {}
+
+
+def map_image_path() -> Optional[Path]:
+    """지도 이미지 경로 (없으면 None)"""
+    for name in MAP_CANDIDATES:
+        path = MAP_DIR / name
+        if path.exists():
+            return path
+    return None
+
+
+def _decode_map() -> np.ndarray:
+    path = map_image_path()
+    if path is not None:
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is not None:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    width, height = DEFAULT_MAP_SIZE
+    return np.full((height, width, 3), 255, dtype=np.uint8)
+
+
+def get_map_raster(width: Optional[int] = None) -> np.ndarray:
+    """
+    지도 RGB 배열 (읽기 전용, 프로세스당 폭별로 한 번만 생성)
+
+    Args:
+        width: Output width in pixels (None = native map resolution); height keeps the aspect
+
+    Returns:
+        Read-only RGB uint8 array (height, width, 3); white if the map file is missing
+    """
+    with _lock:
+        raster = _rasters.get(width)
+        if raster is not None:
+            return raster
+
+        native = _rasters.get(None)
+        if native is None:
+            native = _decode_map()
+            native.flags.writeable = False
+            _rasters[None] = native
+        if width is None or width == native.shape[1]:
+            raster = native
+        else:
+            height = int(round(native.shape[0] * width / native.shape[1]))
+            raster = cv2.resize(native, (int(width), height), interpolation=cv2.INTER_AREA)
+            raster.flags.writeable = False
+        _rasters[width] = raster
+        return raster
+
+
+def get_map_size() -> Tuple[int, int]:
+    """지도 좌표계 크기 (width, height) = 원본 해상도"""
+    height, width = get_map_raster().shape[:2]
+    return width, height
+
+
+def map_extent() -> Tuple[float, float, float, float]:
+    """원본 지도 픽셀 좌표를 유지하는 imshow extent (기본 imshow와 동일)"""
+    width, height = get_map_size()
+    return (-0.5, width - 0.5, height - 0.5, -0.5)
+
+
+def draw_map(ax, **imshow_kwargs):
+    """
+    matplotlib 축에 지도 배경 그리기 (공유 원본 배열, 파일 디코딩 없음)
+
+    좌표계는 원본 지도 픽셀 그대로이므로 기존 ax.imshow(map_img) 위에 그리던
+    좌표를 바꿀 필요가 없습니다.
+
+    Args:
+        ax: Matplotlib axes
+        **imshow_kwargs: Extra ax.imshow arguments (e.g. aspect='auto')
+    """
+    return ax.imshow(get_map_raster(), extent=map_extent(), **imshow_kwargs)
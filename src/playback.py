@@ -0,0 +1,154 @@
+"""
+Client-side Localization Playback
+선택한 시간 구간의 positions를 한 번에 직렬화해 브라우저에서 재생하는 함수들
+
+서버는 구간당 한 번만 payload와 Plotly 애니메이션 figure를 만들고,
+재생/일시정지/프레임 이동은 모두 브라우저에서 처리됩니다 (프레임마다 rerun 없음).
+"""
+import base64
+import numpy as np
+import plotly.graph_objects as go
+from typing import Dict
+
+from src.frame_renderer import DEVICE_COLORS, DOT_ALPHA
+from src.position_index import get_frame_times
+from src.time_axis import SECONDS_PER_SLOT
+
+
+# 서버 재생과 같은 tick (0.1초마다 speed 만큼 프레임 전진)
+FRAME_DURATION_MS = 100
+
+
+def build_playback_payload(index: Dict, start_time_idx: int, end_time_idx: int) -> Dict[str, np.ndarray]:
+    """
+    프레임 인덱스의 시간 구간 → 컬럼형 재생 payload (정렬된 배열 슬라이스)
+
+    Args:
+        index: Dict from load_position_index
+        start_time_idx, end_time_idx: Inclusive time_index window
+
+    Returns:
+        Dict of arrays:
+        - time_index: Time indices with data (frames), ascending
+        - offsets: Row offsets per frame (len = frames + 1); frame i is rows offsets[i]:offsets[i+1]
+        - x, y: float32 positions sorted by time_index
+        - is_ios: bool, True for randomized (iOS) MAC addresses
+    """
+    frame_times = get_frame_times(index, start_time_idx, end_time_idx)
+    if len(frame_times) == 0:
+        row_start = row_end = 0
+    else:
+        row_start = index['offsets'][frame_times[0]]
+        row_end = index['offsets'][frame_times[-1] + 1]
+
+    return {
+        'time_index': frame_times,
+        'offsets': np.append(index['offsets'][frame_times], row_end) - row_start,
+        'x': index['x'][row_start:row_end],
+        'y': index['y'][row_start:row_end],
+        'is_ios': index['is_ios'][row_start:row_end]
+    }
+
+
+def _frame_label(time_index: int) -> str:
+    """프레임 이름 (HH:MM:SS, 10초 슬롯마다 고유)"""
+    seconds = (int(time_index) - 1) * SECONDS_PER_SLOT
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def _rgba(kind: str) -> str:
+    r, g, b = DEVICE_COLORS[kind]
+    return f'rgba({r}, {g}, {b}, {DOT_ALPHA})'
+
+
+def _frame_data(payload: Dict[str, np.ndarray], frame: int):
+    """프레임 하나의 (iOS, Android) trace 좌표 (marker 스타일은 기본 trace에서 상속)"""
+    start, end = payload['offsets'][frame], payload['offsets'][frame + 1]
+    x = payload['x'][start:end].round(1)
+    y = payload['y'][start:end].round(1)
+    is_ios = payload['is_ios'][start:end]
+    return [
+        dict(type='scatter', x=x[is_ios], y=y[is_ios]),
+        dict(type='scatter', x=x[~is_ios], y=y[~is_ios])
+    ]
+
+
+def map_data_uri(image_bytes: bytes, mime: str = 'image/jpeg') -> str:
+    """인코딩된 지도 이미지 → Plotly layout image용 data URI"""
+    return f"data:{mime};base64,{base64.b64encode(image_bytes).decode('ascii')}"
+
+
+def build_playback_figure(
+    payload: Dict[str, np.ndarray],
+    map_uri: str,
+    map_size,
+    frame_step: int = 1,
+    frame_duration_ms: int = FRAME_DURATION_MS
+) -> go.Figure:
+    """
+    payload → 브라우저에서 재생되는 Plotly 애니메이션 figure
+
+    Args:
+        payload: build_playback_payload output
+        map_uri: Map background as a data URI (map_data_uri)
+        map_size: (width, height) of the map in pixel coordinates
+        frame_step: Frames advanced per tick (speed multiplier)
+        frame_duration_ms: Tick length in milliseconds
+
+    Returns:
+        Figure with one animation frame per step, play/pause buttons and a time slider
+    """
+    width, height = map_size
+    frame_ids = np.arange(0, len(payload['time_index']), max(frame_step, 1))
+
+    # go.Scatter 객체 대신 dict로 만들어 프레임당 검증 비용을 줄임
+    frames, steps = [], []
+    still = dict(frame=dict(duration=0, redraw=False), mode='immediate', transition=dict(duration=0))
+    for frame in frame_ids.tolist():
+        name = _frame_label(payload['time_index'][frame])
+        start, end = payload['offsets'][frame], payload['offsets'][frame + 1]
+        n_ios = int(payload['is_ios'][start:end].sum())
+        frames.append(dict(name=name, data=_frame_data(payload, frame), traces=[0, 1]))
+        steps.append(dict(
+            label=f"{name} · iOS {n_ios} / Android {end - start - n_ios} / Total {end - start}",
+            method='animate', args=[[name], still]
+        ))
+
+    traces = [
+        go.Scatter(x=[], y=[], mode='markers', name=name, hoverinfo='skip',
+                   marker=dict(size=9, color=_rgba(kind), line=dict(color='white', width=1)))
+        for kind, name in (('ios', 'iOS'), ('android', 'Android'))
+    ]
+    if frames:
+        for trace, data in zip(traces, frames[0]['data']):
+            trace.update(x=data['x'], y=data['y'])
+
+    play = dict(frame=dict(duration=frame_duration_ms, redraw=False), transition=dict(duration=0), fromcurrent=True)
+    fig = go.Figure(data=traces, frames=frames)
+    fig.update_layout(
+        images=[dict(
+            source=map_uri, xref='x', yref='y', x=0, y=0,
+            sizex=width, sizey=height, sizing='stretch', layer='below'
+        )],
+        xaxis=dict(range=[0, width], visible=False, constrain='domain'),
+        yaxis=dict(range=[height, 0], visible=False, scaleanchor='x'),
+        template="plotly_white",
+        height=700,
+        margin=dict(l=0, r=0, t=30, b=0),
+        legend=dict(orientation='h', yanchor='bottom', y=1.0, xanchor='right', x=1),
+        updatemenus=[dict(
+            type='buttons', direction='left', x=0, y=0, xanchor='left', yanchor='top',
+            buttons=[
+                dict(label='▶️ Play', method='animate', args=[None, play]),
+                dict(label='⏸️ Pause', method='animate', args=[[None], still])
+            ]
+        )],
+        sliders=[dict(
+            x=0.15, len=0.85, y=0, yanchor='top', ticklen=0, minorticklen=0,
+            # 스텝이 수천 개라 눈금 라벨은 숨기고 현재 값만 표시
+            font=dict(color='rgba(0, 0, 0, 0)'),
+            currentvalue=dict(prefix='⏰ ', font=dict(size=16, color='#1f2937')),
+            steps=steps
+        )]
+    )
+    return fig
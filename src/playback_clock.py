@@ -0,0 +1,147 @@
+"""
+Playback Clock
+서버 재생 위치를 rerun 횟수가 아닌 실제 경과 시간(wall clock)으로 계산하는 재생 컨트롤러
+
+재생 위치 = 시작 위치 + 경과 초 × 초당 프레임 수(speed 반영) 이므로,
+렌더링이 늦어지면 화면 갱신 사이의 프레임은 건너뛰고(coalesce) 항상 현재 시각의 프레임을 보여줍니다.
+표시된 프레임의 시각을 기록해 실제 화면 fps와 목표 fps를 비교할 수 있습니다.
+"""
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+
+# 1x = 초당 10 프레임 (기존 0.1초 tick과 같은 속도)
+BASE_FRAMES_PER_SECOND = 10
+# 화면 갱신 상한 (이보다 빠른 speed는 프레임을 건너뜀)
+MAX_DISPLAY_FPS = 10
+FPS_WINDOW_SECONDS = 3.0
+
+
+class PlaybackClock:
+    """
+    Wall-clock 재생 컨트롤러
+
+    Args:
+        num_frames: Number of frames in the playback window
+        speed: Playback speed multiplier (1.0 = BASE_FRAMES_PER_SECOND frames per second)
+        clock: Time source in seconds (monotonic)
+    """
+
+    def __init__(self, num_frames: int, speed: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.num_frames = int(num_frames)
+        self.speed = float(speed)
+        self.clock = clock
+        self.playing = False
+        self._anchor_position = 0.0
+        self._anchor_time = clock()
+        self._shown = deque()
+        self._last_frame: Optional[int] = None
+        self.frames_shown = 0
+        self.frames_dropped = 0
+
+    @property
+    def frames_per_second(self) -> float:
+        """재생 속도 (초당 진행하는 프레임 수)"""
+        return BASE_FRAMES_PER_SECOND * self.speed
+
+    @property
+    def target_fps(self) -> float:
+        """목표 화면 갱신 fps"""
+        return min(self.frames_per_second, MAX_DISPLAY_FPS)
+
+    @property
+    def refresh_interval(self) -> float:
+        """화면 갱신 간격 (초)"""
+        return 1.0 / self.target_fps
+
+    def _position(self, now: float) -> float:
+        if not self.playing:
+            return self._anchor_position
+        return self._anchor_position + (now - self._anchor_time) * self.frames_per_second
+
+    def _set_anchor(self, position: float):
+        self._anchor_position = min(max(position, 0.0), max(self.num_frames - 1, 0))
+        self._anchor_time = self.clock()
+
+    def play(self):
+        if self.playing:
+            return
+        if self._anchor_position >= self.num_frames - 1:
+            self._anchor_position = 0.0
+        self._set_anchor(self._anchor_position)
+        self.playing = True
+        self._shown.clear()
+        self._last_frame = None
+
+    def pause(self):
+        if self.playing:
+            self._set_anchor(self._position(self.clock()))
+            self.playing = False
+
+    def seek(self, frame: int):
+        self._set_anchor(float(frame))
+        self._last_frame = None
+
+    def reset(self):
+        self.playing = False
+        self.seek(0)
+        self._shown.clear()
+        self.frames_shown = 0
+        self.frames_dropped = 0
+
+    def set_speed(self, speed: float):
+        """현재 위치를 유지한 채 속도 변경"""
+        if float(speed) != self.speed:
+            self._set_anchor(self._position(self.clock()))
+            self.speed = float(speed)
+
+    def current_frame(self) -> int:
+        """
+        지금 보여줄 프레임 번호 (끝에 도달하면 자동 정지)
+
+        Returns:
+            Frame number in [0, num_frames - 1]
+        """
+        position = self._position(self.clock())
+        if position >= self.num_frames - 1:
+            self._set_anchor(self.num_frames - 1)
+            self.playing = False
+        return int(min(max(position, 0), max(self.num_frames - 1, 0)))
+
+    def mark_shown(self, frame: int):
+        """
+        프레임 표시 기록 (fps와 건너뛴 프레임 수 집계)
+
+        Args:
+            frame: Frame number that was just displayed
+        """
+        now = self.clock()
+        if self._last_frame is not None and frame > self._last_frame:
+            expected_step = max(int(round(self.frames_per_second / self.target_fps)), 1)
+            self.frames_dropped += max(frame - self._last_frame - expected_step, 0)
+        self._last_frame = frame
+        self.frames_shown += 1
+        self._shown.append(now)
+        while self._shown and now - self._shown[0] > FPS_WINDOW_SECONDS:
+            self._shown.popleft()
+
+    @property
+    def achieved_fps(self) -> float:
+        """최근 FPS_WINDOW_SECONDS 동안의 실제 화면 갱신 fps"""
+        if len(self._shown) < 2:
+            return 0.0
+        elapsed = self._shown[-1] - self._shown[0]
+        return (len(self._shown) - 1) / elapsed if elapsed > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict with target_fps, achieved_fps, frames_shown, frames_dropped
+        """
+        return {
+            'target_fps': self.target_fps,
+            'achieved_fps': self.achieved_fps,
+            'frames_shown': self.frames_shown,
+            'frames_dropped': self.frames_dropped
+        }
@@ -0,0 +1,142 @@
+"""
+Time-indexed Position Store
+날짜별 positions를 time_index 순으로 정렬하고 offsets 배열(CSR)로 프레임을 O(1) 조회하는 함수들
+
+time_index t의 기기들은 x[offsets[t]:offsets[t + 1]] 입니다.
+인덱스는 positions 데이터셋의 date 파티션 안에 position_index.npz로 저장되며,
+원본 parquet이 바뀌면 다시 생성됩니다.
+"""
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.cache_dataset import (
+    positions_date_dir,
+    positions_source_files,
+    read_positions
+)
+from src.cache_schema import classify_randomized_ios
+from src.data_cache import per_date_cache
+from src.time_axis import NUM_TIME_SLOTS
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+INDEX_FILE_NAME = 'position_index.npz'
+INDEX_KEYS = ('offsets', 'x', 'y', 'mac_codes', 'is_ios', 'macs')
+
+
+def _index_path(date_str: str, source_files) -> Path:
+    if source_files[0].parent.parent == positions_date_dir(date_str):
+        return positions_date_dir(date_str) / INDEX_FILE_NAME
+    return CACHE_DIR / f'position_index_{date_str}.npz'
+
+
+def _source_mtimes(source_files) -> np.ndarray:
+    return np.array([f.stat().st_mtime for f in source_files])
+
+
+def _read_only(index: Dict) -> Dict:
+    for value in index.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return index
+
+
+def build_position_index(positions_df: pd.DataFrame) -> Dict:
+    """
+    positions DataFrame → CSR 프레임 인덱스
+
+    Args:
+        positions_df: Positions for one date (time_index, mac_address, x, y)
+
+    Returns:
+        Dict with:
+        - offsets: int64 array (NUM_TIME_SLOTS + 2,); rows of time_index t are offsets[t]:offsets[t + 1]
+        - x, y: float32 positions sorted by time_index
+        - mac_codes: int32 codes into macs, sorted by time_index
+        - is_ios: bool is_randomized_ios flags, sorted by time_index
+        - macs: MAC address strings
+    """
+    time_index = positions_df['time_index'].to_numpy().astype(np.int64)
+    order = np.argsort(time_index, kind='stable')
+    macs = pd.Categorical(positions_df['mac_address'])
+    if 'is_randomized_ios' in positions_df.columns:
+        is_ios = positions_df['is_randomized_ios'].to_numpy(dtype=bool)
+    else:
+        is_ios = classify_randomized_ios(positions_df['mac_address'])
+
+    return {
+        'offsets': np.searchsorted(time_index[order], np.arange(NUM_TIME_SLOTS + 2)),
+        'x': positions_df['x'].to_numpy(dtype=np.float32)[order],
+        'y': positions_df['y'].to_numpy(dtype=np.float32)[order],
+        'mac_codes': macs.codes.astype(np.int32)[order],
+        'is_ios': is_ios[order],
+        'macs': np.asarray(macs.categories, dtype=str)
+    }
+
+
+@per_date_cache
+def load_position_index(date_str: str) -> Optional[Dict]:
+    """
+    날짜별 프레임 인덱스 로드 (없거나 오래되었으면 생성 후 저장)
+
+    Returns:
+        Dict from build_position_index (read-only arrays), or None if the date has no position cache
+    """
+    source_files = positions_source_files(date_str)
+    if not source_files:
+        return None
+
+    index_file = _index_path(date_str, source_files)
+    source_mtimes = _source_mtimes(source_files)
+
+    if index_file.exists():
+        with np.load(index_file, allow_pickle=False) as data:
+            if set(INDEX_KEYS) <= set(data.files) and np.array_equal(data['source_mtimes'], source_mtimes):
+                return _read_only({key: data[key] for key in INDEX_KEYS})
+
+    index = build_position_index(read_positions(date_str))
+
+    try:
+        np.savez(index_file, source_mtimes=source_mtimes, **index)
+    except OSError:
+        pass  # 읽기 전용 배포 환경에서는 메모리 캐시만 사용
+
+    return _read_only(index)
+
+
+def get_frame_times(index: Dict, start_time_idx: int = 1, end_time_idx: int = NUM_TIME_SLOTS) -> np.ndarray:
+    """
+    구간 안에서 기기가 하나 이상 있는 time_index 목록 (오름차순)
+
+    Args:
+        index: Dict from load_position_index
+        start_time_idx, end_time_idx: Inclusive time_index window
+    """
+    start = max(int(start_time_idx), 1)
+    end = min(int(end_time_idx), NUM_TIME_SLOTS)
+    if start > end:
+        return np.empty(0, dtype=np.int64)
+    counts = np.diff(index['offsets'][start:end + 2])
+    return np.flatnonzero(counts) + start
+
+
+def get_frame(index: Dict, time_index: int) -> Dict[str, np.ndarray]:
+    """
+    한 time_index의 기기 위치 (배열 슬라이스, 복사 없음)
+
+    Returns:
+        Dict with x, y, mac_codes, is_ios views for the frame
+    """
+    if not 1 <= time_index <= NUM_TIME_SLOTS:
+        start = end = 0
+    else:
+        start, end = index['offsets'][time_index], index['offsets'][time_index + 1]
+    return {
+        'x': index['x'][start:end],
+        'y': index['y'][start:end],
+        'mac_codes': index['mac_codes'][start:end],
+        'is_ios': index['is_ios'][start:end]
+    }
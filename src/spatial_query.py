@@ -0,0 +1,194 @@
+"""
+Spatial Density Query
+지도 영역(다각형/사각형) × 시간 구간의 기기 수를 grid 인덱스로 조회하는 함수들
+
+positions를 (10분 time bucket, CELL_SIZE 픽셀 grid cell) 순으로 정렬하고 offsets 배열(CSR)을 두어,
+질의 시 영역과 겹치는 cell의 점만 모읍니다. 다각형은 지도 픽셀 마스크로 래스터화하여
+완전히 안쪽인 cell의 점은 바로 포함하고, 경계 cell의 점만 마스크로 확인합니다.
+
+Usage:
+    from src.spatial_query import query_region
+    result = query_region('2025-10-12', [(300, 200), (420, 200), (420, 300), (300, 300)],
+                          start_time_idx=6121, end_time_idx=6840)
+    result['devices'], result['observations']
+"""
+import cv2
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple
+
+from src.data_cache import per_date_cache
+from src.map_raster import get_map_size
+from src.position_index import load_position_index
+from src.time_axis import NUM_TIME_SLOTS
+
+
+# grid cell 크기 (지도 픽셀)
+CELL_SIZE = 16
+# time bucket = 10분 (positions row group과 동일)
+BUCKET_SLOTS = 60
+
+
+def build_spatial_index(position_index: Dict, map_size: Tuple[int, int], cell_size: int = CELL_SIZE) -> Dict:
+    """
+    프레임 인덱스 → (time bucket, grid cell) CSR 인덱스
+
+    Args:
+        position_index: Dict from position_index.load_position_index
+        map_size: (width, height) of the map pixel coordinate system
+        cell_size: Grid cell size in map pixels
+
+    Returns:
+        Dict with:
+        - offsets: int64 (n_buckets * n_cells + 1,); points of (bucket b, cell c) are
+          offsets[b * n_cells + c]:offsets[b * n_cells + c + 1]
+        - x, y: float32, time_index: int32, mac_codes: int32 (sorted by bucket, cell)
+        - macs: MAC address strings
+        - cell_size, n_cols, n_rows: Grid shape
+    """
+    width, height = map_size
+    n_cols = -(-width // cell_size)
+    n_rows = -(-height // cell_size)
+    n_cells = n_cols * n_rows
+    n_buckets = -(-NUM_TIME_SLOTS // BUCKET_SLOTS)
+
+    counts = np.diff(position_index['offsets'][1:NUM_TIME_SLOTS + 2])
+    time_index = np.repeat(np.arange(1, NUM_TIME_SLOTS + 1, dtype=np.int32), counts)
+    start = position_index['offsets'][1]
+    x = position_index['x'][start:start + len(time_index)]
+    y = position_index['y'][start:start + len(time_index)]
+    mac_codes = position_index['mac_codes'][start:start + len(time_index)]
+
+    cols = np.clip(x // cell_size, 0, n_cols - 1).astype(np.int64)
+    rows = np.clip(y // cell_size, 0, n_rows - 1).astype(np.int64)
+    keys = (time_index.astype(np.int64) - 1) // BUCKET_SLOTS * n_cells + rows * n_cols + cols
+    order = np.argsort(keys, kind='stable')
+
+    return {
+        'offsets': np.searchsorted(keys[order], np.arange(n_buckets * n_cells + 1)),
+        'x': x[order],
+        'y': y[order],
+        'time_index': time_index[order],
+        'mac_codes': mac_codes[order],
+        'macs': position_index['macs'],
+        'cell_size': cell_size,
+        'n_cols': n_cols,
+        'n_rows': n_rows
+    }
+
+
+@per_date_cache
+def load_spatial_index(date_str: str) -> Optional[Dict]:
+    """
+    날짜별 grid 인덱스 (프레임 인덱스로부터 생성, 메모리 캐시)
+
+    Returns:
+        Dict from build_spatial_index, or None if the date has no position cache
+    """
+    position_index = load_position_index(date_str)
+    if position_index is None:
+        return None
+    return build_spatial_index(position_index, get_map_size())
+
+
+def region_mask(polygon: Sequence[Tuple[float, float]], map_size: Tuple[int, int]) -> np.ndarray:
+    """
+    다각형 (지도 픽셀 좌표) → bool 마스크 (height, width)
+
+    Args:
+        polygon: Vertices [(x, y), ...]; a rectangle can be given as its 4 corners
+        map_size: (width, height)
+    """
+    width, height = map_size
+    mask = np.zeros((height, width), dtype=np.uint8)
+    points = np.rint(np.asarray(polygon, dtype=np.float64)).astype(np.int32).reshape(-1, 1, 2)
+    if len(points) >= 3:
+        cv2.fillPoly(mask, [points], 1)
+    return mask.astype(bool)
+
+
+def rectangle(x0: float, y0: float, x1: float, y1: float):
+    """사각형 → 꼭짓점 목록"""
+    return [(x0, y0), (x1, y0), (x1, y1), (x0, y1)]
+
+
+def _cell_coverage(mask: np.ndarray, spatial_index: Dict) -> np.ndarray:
+    """cell별 마스크 포함 비율 (0 = 밖, 1 = 완전히 안쪽)"""
+    cell_size, n_rows, n_cols = spatial_index['cell_size'], spatial_index['n_rows'], spatial_index['n_cols']
+    padded = np.zeros((n_rows * cell_size, n_cols * cell_size), dtype=np.float32)
+    padded[:mask.shape[0], :mask.shape[1]] = mask
+    # 정수 배 축소의 INTER_AREA = cell 평균
+    return cv2.resize(padded, (n_cols, n_rows), interpolation=cv2.INTER_AREA).ravel()
+
+
+def query_mask(spatial_index: Dict, mask: np.ndarray, start_time_idx: int, end_time_idx: int) -> Dict:
+    """
+    영역 마스크 × 시간 구간의 positions 조회
+
+    Args:
+        spatial_index: Dict from build_spatial_index
+        mask: Bool region mask (height, width) in map pixels
+        start_time_idx, end_time_idx: Inclusive time_index window
+
+    Returns:
+        Dict with:
+        - observations: Position rows inside the region
+        - devices: Unique MAC addresses inside the region
+        - macs: Those MAC addresses
+        - time_index, counts: Devices inside the region per time slot (slots with data only)
+    """
+    start = max(int(start_time_idx), 1)
+    end = min(int(end_time_idx), NUM_TIME_SLOTS)
+    n_cells = spatial_index['n_cols'] * spatial_index['n_rows']
+
+    coverage = _cell_coverage(mask, spatial_index)
+    cells = np.flatnonzero(coverage > 0)
+    buckets = np.arange((start - 1) // BUCKET_SLOTS, (end - 1) // BUCKET_SLOTS + 1) if start <= end else np.empty(0, int)
+
+    keys = (buckets[:, None] * n_cells + cells[None, :]).ravel()
+    range_starts = spatial_index['offsets'][keys]
+    range_lengths = spatial_index['offsets'][keys + 1] - range_starts
+    # 여러 [start, end) 구간의 행 번호를 한 번에 펼침
+    total = int(range_lengths.sum())
+    rows = np.repeat(range_starts - np.cumsum(range_lengths) + range_lengths, range_lengths) + np.arange(total)
+    partial_cell = np.repeat(np.tile(coverage[cells] < 1, len(buckets)), range_lengths)
+
+    time_index = spatial_index['time_index'][rows]
+    keep = (time_index >= start) & (time_index <= end)
+    if partial_cell.any():
+        x = spatial_index['x'][rows[partial_cell]].astype(np.int64).clip(0, mask.shape[1] - 1)
+        y = spatial_index['y'][rows[partial_cell]].astype(np.int64).clip(0, mask.shape[0] - 1)
+        keep[partial_cell] &= mask[y, x]
+    rows, time_index = rows[keep], time_index[keep]
+
+    mac_codes = np.unique(spatial_index['mac_codes'][rows])
+    slots, counts = np.unique(time_index, return_counts=True)
+    return {
+        'observations': len(rows),
+        'devices': len(mac_codes),
+        'macs': spatial_index['macs'][mac_codes],
+        'time_index': slots.astype(np.int64),
+        'counts': counts
+    }
+
+
+def query_region(
+    date_str: str,
+    polygon: Sequence[Tuple[float, float]],
+    start_time_idx: int = 1,
+    end_time_idx: int = NUM_TIME_SLOTS
+) -> Optional[Dict]:
+    """
+    다각형/사각형 영역 × 시간 구간의 기기 수 조회
+
+    Args:
+        date_str: Date (YYYY-MM-DD)
+        polygon: Vertices [(x, y), ...] in map pixel coordinates (see rectangle())
+        start_time_idx, end_time_idx: Inclusive time_index window
+
+    Returns:
+        Dict from query_mask, or None if the date has no position cache
+    """
+    spatial_index = load_spatial_index(date_str)
+    if spatial_index is None:
+        return None
+    return query_mask(spatial_index, region_mask(polygon, get_map_size()), start_time_idx, end_time_idx)
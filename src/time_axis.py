@@ -0,0 +1,77 @@
+"""
+Time Axis Helpers
+10초 단위 time_index ↔ 시각 변환 함수들 (벡터화)
+
+time_index는 1부터 시작하며, time_index t는 자정 이후 (t - 1) * 10초를 의미합니다.
+"""
+import numpy as np
+
+
+# 10초 단위 하루 슬롯 수 (time_index 1 ~ 8640)
+SECONDS_PER_SLOT = 10
+NUM_TIME_SLOTS = 86400 // SECONDS_PER_SLOT
+
+
+def _format_labels(time_index: np.ndarray) -> np.ndarray:
+    seconds = (time_index - 1) * SECONDS_PER_SLOT
+    hours = (seconds // 3600).astype(str)
+    minutes = ((seconds % 3600) // 60).astype(str)
+    return np.char.add(np.char.add(np.char.zfill(hours, 2), ':'), np.char.zfill(minutes, 2))
+
+
+# "HH:MM" 라벨 룩업 테이블 (TIME_LABELS[t - 1] == time_index t의 라벨)
+TIME_LABELS = _format_labels(np.arange(1, NUM_TIME_SLOTS + 1)).astype(object)
+TIME_LABELS.flags.writeable = False
+
+
+def time_index_to_time(time_index) -> str:
+    """Convert time_index to HH:MM format"""
+    if 1 <= time_index <= NUM_TIME_SLOTS:
+        return TIME_LABELS[int(time_index) - 1]
+    seconds = (int(time_index) - 1) * SECONDS_PER_SLOT
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}"
+
+
+def time_to_time_index(time_str) -> int:
+    """Convert HH:MM to time_index"""
+    hours, minutes = map(int, time_str.split(':'))
+    return minutes_to_time_index(hours * 60 + minutes)
+
+
+def minutes_to_time_index(minutes):
+    """Convert minutes since midnight (scalar or array) to time_index"""
+    return (minutes * 60) // SECONDS_PER_SLOT + 1
+
+
+def time_index_to_labels(time_index) -> np.ndarray:
+    """
+    time_index 배열 → "HH:MM" 라벨 배열 (룩업 테이블 인덱싱)
+
+    Args:
+        time_index: Array-like of time indices
+
+    Returns:
+        Object array of "HH:MM" strings, same shape as input
+    """
+    time_index = np.asarray(time_index, dtype=np.int64)
+    in_range = (time_index >= 1) & (time_index <= NUM_TIME_SLOTS)
+    if in_range.all():
+        return TIME_LABELS[time_index - 1]
+
+    labels = np.empty(time_index.shape, dtype=object)
+    labels[in_range] = TIME_LABELS[time_index[in_range] - 1]
+    labels[~in_range] = _format_labels(time_index[~in_range])
+    return labels
+
+
+def time_index_to_hour_decimal(time_index) -> np.ndarray:
+    """
+    time_index 배열 → 시간(소수) 배열 (차트 x축용)
+
+    Args:
+        time_index: Array-like of time indices
+
+    Returns:
+        Float array of hours since midnight
+    """
+    return (np.asarray(time_index, dtype=np.int64) - 1) * SECONDS_PER_SLOT / 3600
@@ -0,0 +1,145 @@
+"""
+Zone × Time Traffic Cube
+날짜별 zone × time_index 트래픽 큐브 생성/캐시 함수들
+"""
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.cache_schema import to_compact_stats
+from src.data_cache import per_date_cache
+from src.time_axis import NUM_TIME_SLOTS
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+SWARD_CSV = PROJECT_ROOT / 'Data' / 'SWard_description' / 'swards.csv'
+
+
+def _cube_path(date_str: str) -> Path:
+    return CACHE_DIR / f'traffic_cube_{date_str}.npz'
+
+
+def _source_mtimes(stats_file: Path) -> np.ndarray:
+    return np.array([stats_file.stat().st_mtime, SWARD_CSV.stat().st_mtime])
+
+
+def build_traffic_cube(stats_df: pd.DataFrame, sward_df: pd.DataFrame) -> Dict:
+    """
+    stats DataFrame으로부터 zone × time 트래픽 큐브 생성
+
+    Args:
+        stats_df: stats_timeseries DataFrame
+            (columns: time_index, sward_name, count, total_devices)
+        sward_df: S-Ward descriptions (columns: name, description)
+
+    Returns:
+        Dict with:
+        - zones: zone names (row order of zone_counts)
+        - zone_counts: int32 array (n_zones × NUM_TIME_SLOTS), summed S-Ward counts
+        - total_devices: int32 array (NUM_TIME_SLOTS,), store-wide device count
+        Column t holds time_index t + 1.
+    """
+    zones = sorted(sward_df['description'].unique().tolist(), key=str.lower)
+    zone_row = {zone: i for i, zone in enumerate(zones)}
+    sward_row = {
+        name: zone_row[zone]
+        for name, zone in zip(sward_df['name'], sward_df['description'])
+    }
+
+    rows = stats_df['sward_name'].map(sward_row).to_numpy(dtype=float)
+    cols = stats_df['time_index'].to_numpy().astype(np.int64) - 1
+    valid = ~np.isnan(rows) & (cols >= 0) & (cols < NUM_TIME_SLOTS)
+
+    flat = rows[valid].astype(np.int64) * NUM_TIME_SLOTS + cols[valid]
+    zone_counts = np.bincount(
+        flat,
+        weights=stats_df['count'].to_numpy()[valid],
+        minlength=len(zones) * NUM_TIME_SLOTS
+    ).astype(np.int32).reshape(len(zones), NUM_TIME_SLOTS)
+
+    # total_devices는 time_index별로 동일한 값이 반복 저장됨 (groupby().first()와 동일)
+    in_range = (cols >= 0) & (cols < NUM_TIME_SLOTS)
+    total_devices = np.zeros(NUM_TIME_SLOTS, dtype=np.int32)
+    first_rows = ~pd.Series(cols).duplicated().to_numpy() & in_range
+    total_devices[cols[first_rows]] = stats_df['total_devices'].to_numpy()[first_rows]
+
+    return {
+        'zones': zones,
+        'zone_counts': zone_counts,
+        'total_devices': total_devices
+    }
+
+
+@per_date_cache
+def load_traffic_cube(date_str: str) -> Optional[Dict]:
+    """
+    날짜별 트래픽 큐브 로드 (없거나 오래되었으면 생성 후 저장)
+
+    큐브는 stats parquet 옆에 traffic_cube_{date}.npz로 저장되며,
+    stats parquet 또는 swards.csv가 변경되면 다시 생성됩니다.
+
+    Returns:
+        Dict from build_traffic_cube, or None if stats data is missing
+    """
+    stats_file = CACHE_DIR / f'stats_timeseries_{date_str}.parquet'
+    if not stats_file.exists() or not SWARD_CSV.exists():
+        return None
+
+    cube_file = _cube_path(date_str)
+    source_mtimes = _source_mtimes(stats_file)
+
+    if cube_file.exists():
+        with np.load(cube_file, allow_pickle=False) as data:
+            if np.array_equal(data['source_mtimes'], source_mtimes):
+                return {
+                    'zones': data['zones'].tolist(),
+                    'zone_counts': data['zone_counts'],
+                    'total_devices': data['total_devices']
+                }
+
+    cube = build_traffic_cube(to_compact_stats(pd.read_parquet(stats_file)), pd.read_csv(SWARD_CSV))
+
+    try:
+        np.savez_compressed(
+            cube_file,
+            zones=np.array(cube['zones']),
+            zone_counts=cube['zone_counts'],
+            total_devices=cube['total_devices'],
+            source_mtimes=source_mtimes
+        )
+    except OSError:
+        pass  # 읽기 전용 배포 환경에서는 메모리 캐시만 사용
+
+    return cube
+
+
+def get_total_traffic(cube: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    전체 트래픽 시계열
+
+    Returns:
+        Tuple of (time_index array, total_devices array), only slots with data
+    """
+    total = cube['total_devices']
+    cols = np.flatnonzero(total)
+    return cols + 1, total[cols]
+
+
+def get_zone_traffic(cube: Dict, zones: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    선택한 zone들의 합산 트래픽 시계열 (큐브 행 슬라이싱 + 합산)
+
+    Args:
+        cube: Dict from load_traffic_cube
+        zones: Zone names to sum
+
+    Returns:
+        Tuple of (time_index array, count array), only slots with data
+    """
+    zone_row = {zone: i for i, zone in enumerate(cube['zones'])}
+    rows = [zone_row[zone] for zone in zones if zone in zone_row]
+    counts = cube['zone_counts'][rows].sum(axis=0)
+    cols = np.flatnonzero(counts)
+    return cols + 1, counts[cols]
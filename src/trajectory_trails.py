@@ -0,0 +1,140 @@
+"""
+Trajectory Trails
+재생 중인 기기별 최근 이동 궤적(trail)을 ring buffer로 누적하는 함수들
+
+TrailBuffer는 MAC 코드별로 최근 trail_slots개 time slot의 위치를 ring buffer에 보관하고,
+재생이 앞으로 진행될 때 새로 지나간 프레임만 추가합니다 (구간 전체를 다시 조회하지 않음).
+뒤로 이동하거나 trail 길이 이상 건너뛰면 현재 시각 이전 trail_slots개 프레임만 다시 채웁니다.
+buffer의 열은 하루 전체 MAC이 아니라 재생 구간(과 그 앞 trail 길이)에 등장하는 기기만큼만 만듭니다.
+"""
+import numpy as np
+from typing import Dict, Tuple
+
+from src.time_axis import NUM_TIME_SLOTS, SECONDS_PER_SLOT
+
+
+DEFAULT_TRAIL_SECONDS = 120
+
+
+class TrailBuffer:
+    """
+    기기별 최근 위치 ring buffer
+
+    열 c는 구간에 등장하는 기기 codes[c]이며 (columns[MAC 코드] = c),
+    xy[r, c]는 time_index t (t % trail_slots == r)에서 그 기기의 위치이고
+    stamp[r, c] == t 일 때만 유효합니다 (오래된 값은 지우지 않고 stamp로 구분).
+
+    Args:
+        index: Dict from position_index.load_position_index
+        trail_seconds: Trail length in seconds
+        start_time_idx, end_time_idx: Inclusive playback window; trails are kept only for
+            time slots from trail_seconds before start_time_idx up to end_time_idx
+    """
+
+    def __init__(
+        self,
+        index: Dict,
+        trail_seconds: int = DEFAULT_TRAIL_SECONDS,
+        start_time_idx: int = 1,
+        end_time_idx: int = NUM_TIME_SLOTS
+    ):
+        self.index = index
+        self.trail_slots = max(int(trail_seconds) // SECONDS_PER_SLOT, 2)
+        self.first_slot = max(int(start_time_idx) - self.trail_slots + 1, 1)
+        self.last_slot = min(int(end_time_idx), NUM_TIME_SLOTS)
+
+        offsets = index['offsets']
+        if self.first_slot <= self.last_slot:
+            rows = slice(offsets[self.first_slot], offsets[self.last_slot + 1])
+        else:
+            rows = slice(0, 0)
+        window_codes = index['mac_codes'][rows]
+        self.codes = np.unique(window_codes)
+        self.columns = np.full(len(index['macs']), -1, dtype=np.int32)
+        self.columns[self.codes] = np.arange(len(self.codes), dtype=np.int32)
+        n_devices = len(self.codes)
+
+        self.xy = np.zeros((self.trail_slots, n_devices, 2), dtype=np.float32)
+        self.stamp = np.full((self.trail_slots, n_devices), -1, dtype=np.int64)
+        self.last_seen = np.full(n_devices, -NUM_TIME_SLOTS, dtype=np.int64)
+        self.mac_is_ios = np.zeros(n_devices, dtype=bool)
+        self.mac_is_ios[self.columns[window_codes]] = index['is_ios'][rows]
+        self.time_index = None
+
+    def reset(self):
+        self.stamp.fill(-1)
+        self.last_seen.fill(-NUM_TIME_SLOTS)
+        self.time_index = None
+
+    def _push(self, time_index: int):
+        start, end = self.index['offsets'][time_index], self.index['offsets'][time_index + 1]
+        if start == end:
+            return
+        columns = self.columns[self.index['mac_codes'][start:end]]
+        slot = time_index % self.trail_slots
+        self.xy[slot, columns, 0] = self.index['x'][start:end]
+        self.xy[slot, columns, 1] = self.index['y'][start:end]
+        self.stamp[slot, columns] = time_index
+        self.last_seen[columns] = time_index
+
+    def advance(self, time_index: int):
+        """
+        재생 위치를 time_index로 이동 (앞으로 진행하면 새 프레임만 추가)
+
+        Args:
+            time_index: Current playback time_index
+        """
+        time_index = int(time_index)
+        if (
+            self.time_index is None
+            or time_index < self.time_index
+            or time_index - self.time_index >= self.trail_slots
+        ):
+            self.reset()
+            first = time_index - self.trail_slots + 1
+        else:
+            first = self.time_index + 1
+
+        for t in range(max(first, self.first_slot), min(time_index, self.last_slot) + 1):
+            self._push(t)
+        self.time_index = time_index
+
+    def segments(self) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        활성 기기의 trail 선분 (관측 사이 빈 slot은 건너뛰어 이전 관측과 연결)
+
+        Returns:
+            Dict of kind ('ios' / 'android') -> (start_xy, end_xy, age)
+            - start_xy, end_xy: float32 (n, 2) map pixel coordinates
+            - age: float32 (n,) in [0, 1); 0 for the newest segments
+        """
+        empty = (np.empty((0, 2), np.float32), np.empty((0, 2), np.float32), np.empty(0, np.float32))
+        if self.time_index is None:
+            return {'ios': empty, 'android': empty}
+
+        now = self.time_index
+        active = np.flatnonzero(self.last_seen > now - self.trail_slots)
+
+        # 행 k = k 슬롯 전 (최신순)
+        ages = np.arange(self.trail_slots)
+        rows = (now - ages) % self.trail_slots
+        # (rows × active) 한 번에 인덱싱 (전체 열을 복사한 뒤 고르지 않음)
+        window = np.ix_(rows, active)
+        valid = self.stamp[window] == (now - ages)[:, None]
+        xy = self.xy[window]
+
+        # 각 관측의 바로 이전(더 오래된) 관측 행: 아래쪽 누적 최솟값
+        observed = np.where(valid, ages[:, None], self.trail_slots)
+        older = np.minimum.accumulate(observed[::-1], axis=0)[::-1]
+        older = np.vstack([older[1:], np.full((1, len(active)), self.trail_slots)])
+        age_idx, col_idx = np.nonzero(valid & (older < self.trail_slots))
+        older_idx = older[age_idx, col_idx]
+
+        is_ios = self.mac_is_ios[active[col_idx]]
+        start_xy = xy[age_idx, col_idx]
+        end_xy = xy[older_idx, col_idx]
+        age = (age_idx / self.trail_slots).astype(np.float32)
+        return {
+            'ios': (start_xy[is_ios], end_xy[is_ios], age[is_ios]),
+            'android': (start_xy[~is_ios], end_xy[~is_ios], age[~is_ios])
+        }
@@ -0,0 +1,212 @@
+"""
+Localization Video Export
+날짜/시간 구간의 Localization 재생을 WebM / MP4 영상으로 미리 렌더링하는 함수들
+
+프레임 묶음(chunk)을 여러 프로세스에서 동시에 렌더링하고(FrameRenderer.render_positions),
+메인 프로세스는 도착 순서대로 OpenCV VideoWriter에 기록합니다.
+결과는 Data/Cache/Video에 저장되며 positions 캐시가 바뀌지 않는 한 재사용됩니다.
+
+Usage:
+    python -m src.video_export --date 2025-10-12 --start 09:00 --end 10:00
+    python -m src.video_export --date 2025-10-12 --start 09:00 --end 10:00 --format mp4 --step 2
+    python -m src.video_export --date 2025-10-12 --start 09:00 --end 10:00 --trails 120
+"""
+import argparse
+import os
+import time
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.cache_dataset import positions_source_files
+from src.frame_renderer import DEFAULT_OUTPUT_WIDTH, FrameRenderer
+from src.map_raster import get_map_raster, get_map_size
+from src.position_index import load_position_index, get_frame_times, get_frame
+from src.time_axis import time_to_time_index
+from src.trajectory_trails import TrailBuffer
+
+
+PROJECT_ROOT = Path(__file__).parent.parent
+CACHE_DIR = PROJECT_ROOT / 'Data' / 'Cache'
+VIDEO_DIR = CACHE_DIR / 'Video'
+
+# 포맷별 fourcc 후보 (앞에서부터 사용 가능한 코덱 선택)
+# pip opencv에는 H.264 인코더가 없어 mp4는 보통 mp4v(MPEG-4 Part 2)로 기록되며,
+# 브라우저 재생은 webm이 안전합니다. VP9는 VP8보다 인코딩이 10배 가까이 느려 VP8을 우선합니다.
+VIDEO_CODECS = {
+    'webm': ('VP80', 'VP90'),
+    'mp4': ('avc1', 'mp4v')
+}
+VIDEO_MIME = {'webm': 'video/webm', 'mp4': 'video/mp4'}
+
+# 서버 재생과 같은 속도 (0.1초마다 한 프레임)
+DEFAULT_FPS = 10
+FRAMES_PER_CHUNK = 60
+
+# 워커 프로세스별 상태 (initializer에서 한 번 생성)
+_worker = {}
+
+
+def video_path(
+    date_str: str, start_time_idx: int, end_time_idx: int, frame_step: int = 1, fmt: str = 'webm', trail_seconds: int = 0
+) -> Path:
+    trail = f'_trail{trail_seconds}' if trail_seconds else ''
+    return VIDEO_DIR / f'localization_{date_str}_{start_time_idx}-{end_time_idx}_x{frame_step}{trail}.{fmt}'
+
+
+def _is_fresh(path: Path, date_str: str) -> bool:
+    if not path.exists():
+        return False
+    sources = positions_source_files(date_str)
+    return bool(sources) and path.stat().st_mtime >= max(f.stat().st_mtime for f in sources)
+
+
+def get_cached_video(
+    date_str: str, start_time_idx: int, end_time_idx: int, frame_step: int = 1, fmt: str = 'webm', trail_seconds: int = 0
+) -> Optional[Path]:
+    """
+    이미 export된 영상 경로 (없거나 positions 캐시보다 오래되었으면 None)
+    """
+    path = video_path(date_str, start_time_idx, end_time_idx, frame_step, fmt, trail_seconds)
+    return path if _is_fresh(path, date_str) else None
+
+
+def _init_worker(date_str: str, trail_seconds: int = 0):
+    _worker['index'] = load_position_index(date_str)
+    _worker['renderer'] = FrameRenderer(get_map_raster(DEFAULT_OUTPUT_WIDTH), map_size=get_map_size())
+    _worker['trail_seconds'] = trail_seconds
+
+
+def _render_chunk(time_indices: List[int]) -> List[bytes]:
+    """워커: time_index 묶음 → JPEG 프레임 목록 (프로세스 간 전송량을 줄이기 위해 인코딩)"""
+    renderer, index = _worker['renderer'], _worker['index']
+    # chunk마다 새 buffer: 첫 프레임에서 trail 길이만큼만 채운 뒤 이후는 증분 추가
+    trail_buffer = None
+    if _worker['trail_seconds']:
+        trail_buffer = TrailBuffer(index, _worker['trail_seconds'], time_indices[0], time_indices[-1])
+    encoded = []
+    for t in time_indices:
+        trails = None
+        if trail_buffer is not None:
+            trail_buffer.advance(t)
+            trails = trail_buffer.segments()
+        encoded.append(renderer.encode(renderer.render_positions(get_frame(index, t), t, trails=trails), quality=95))
+    return encoded
+
+
+def _open_writer(path: Path, fmt: str, fps: float, size) -> cv2.VideoWriter:
+    for codec in VIDEO_CODECS[fmt]:
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*codec), fps, size)
+        if writer.isOpened():
+            return writer
+        writer.release()
+    raise RuntimeError(f"No available {fmt} encoder among {VIDEO_CODECS[fmt]}")
+
+
+def export_localization_video(
+    date_str: str,
+    start_time_idx: int,
+    end_time_idx: int,
+    fmt: str = 'webm',
+    fps: float = DEFAULT_FPS,
+    frame_step: int = 1,
+    max_workers: Optional[int] = None,
+    overwrite: bool = False,
+    trail_seconds: int = 0
+) -> Optional[Dict]:
+    """
+    시간 구간의 Localization 재생을 영상 파일로 렌더링
+
+    Args:
+        date_str: Date (YYYY-MM-DD)
+        start_time_idx, end_time_idx: Inclusive time_index window
+        fmt: 'webm' or 'mp4'
+        fps: Output frame rate
+        frame_step: Use every n-th frame with data (speed multiplier)
+        max_workers: Render processes (default: CPU count)
+        overwrite: Re-render even if a fresh cached video exists
+        trail_seconds: Draw each device's trajectory over the last n seconds (0 = dots only)
+
+    Returns:
+        Dict with path, frames, seconds, cached, or None if the window has no position data
+    """
+    path = video_path(date_str, start_time_idx, end_time_idx, frame_step, fmt, trail_seconds)
+    if not overwrite and _is_fresh(path, date_str):
+        return {'path': path, 'frames': None, 'seconds': 0.0, 'cached': True}
+
+    index = load_position_index(date_str)
+    if index is None:
+        return None
+    frame_times = get_frame_times(index, start_time_idx, end_time_idx)[::max(frame_step, 1)].tolist()
+    if not frame_times:
+        return None
+
+    start = time.perf_counter()
+    renderer = FrameRenderer(get_map_raster(DEFAULT_OUTPUT_WIDTH), map_size=get_map_size())
+    # 코덱 호환을 위해 짝수 해상도로 자름
+    width, height = renderer.width - renderer.width % 2, renderer.height - renderer.height % 2
+
+    chunks = [frame_times[i:i + FRAMES_PER_CHUNK] for i in range(0, len(frame_times), FRAMES_PER_CHUNK)]
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(chunks)))
+
+    VIDEO_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'.{path.stem}.tmp.{fmt}')
+    writer = _open_writer(tmp_path, fmt, fps, (width, height))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(date_str, trail_seconds)) as executor:
+            # map은 chunk 순서를 유지하므로 렌더링과 인코딩이 겹쳐서 진행됨
+            for encoded_frames in executor.map(_render_chunk, chunks):
+                for encoded in encoded_frames:
+                    frame = cv2.imdecode(np.frombuffer(encoded, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    writer.write(frame[:height, :width])
+    finally:
+        writer.release()
+    tmp_path.replace(path)
+
+    return {
+        'path': path,
+        'frames': len(frame_times),
+        'seconds': time.perf_counter() - start,
+        'cached': False
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export Localization playback to a video file')
+    parser.add_argument('--date', required=True, help='YYYY-MM-DD')
+    parser.add_argument('--start', default='09:00', help='HH:MM')
+    parser.add_argument('--end', default='10:00', help='HH:MM')
+    parser.add_argument('--format', choices=sorted(VIDEO_CODECS), default='webm')
+    parser.add_argument('--fps', type=float, default=DEFAULT_FPS)
+    parser.add_argument('--step', type=int, default=1, help='use every n-th frame')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--trails', type=int, default=0, help='trajectory trail length in seconds (0 = off)')
+    parser.add_argument('--overwrite', action='store_true')
+    args = parser.parse_args()
+
+    result = export_localization_video(
+        args.date,
+        time_to_time_index(args.start),
+        time_to_time_index(args.end),
+        fmt=args.format,
+        fps=args.fps,
+        frame_step=args.step,
+        max_workers=args.workers,
+        overwrite=args.overwrite,
+        trail_seconds=args.trails
+    )
+    if result is None:
+        print(f"No position data for {args.date} {args.start}-{args.end}")
+    elif result['cached']:
+        print(f"Up to date: {result['path']}")
+    else:
+        print(
+            f"Wrote {result['path']} ({result['frames']} frames in {result['seconds']:.1f} s, "
+            f"{result['frames'] / result['seconds']:.1f} frames/s)"
+        )
+
+
+if __name__ == '__main__':
+    main()
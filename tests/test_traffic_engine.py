@@ -0,0 +1,236 @@
+"""
+traffic_engine 회귀 테스트
+벡터화 구현이 기존 time_index별 set 합집합 루프 / 단순 groupby 참조 구현과 같은 결과를 내는지 확인
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_loader import load_zone_positions
+from src.time_axis import SECONDS_PER_SLOT, time_index_to_time
+from src.traffic_engine import (
+    OS_TRAFFIC_COLUMNS,
+    VISIT_COLUMNS,
+    VISIT_GAP_MINUTES,
+    compute_cumulative_visitors,
+    compute_os_traffic,
+    compute_zone_visits
+)
+
+
+def _reference_cumulative(zone_positions: pd.DataFrame, qualified_macs) -> pd.DataFrame:
+    """user-001 이전 main.py Section 3의 루프 그대로"""
+    cumulative_data = []
+    seen_macs = set()
+    # 기존 루프는 int64 time_index에서 돌았으므로 compact int16 캐시에서 overflow 나지 않게 int로
+    for time_idx in map(int, sorted(zone_positions['time_index'].unique())):
+        current_macs = set(zone_positions[zone_positions['time_index'] == time_idx]['mac_address'].unique())
+        seen_macs.update(current_macs)
+        qualified_count = len(seen_macs & set(qualified_macs))
+        hour_decimal = ((time_idx - 1) * 10) / 3600
+        time_str = time_index_to_time(time_idx)
+        cumulative_data.append({'time_index': time_idx, 'hour_decimal': hour_decimal, 'time': time_str, 'cumulative_visitors': qualified_count})
+    return pd.DataFrame(cumulative_data)
+
+
+def _assert_matches_reference(zone_positions: pd.DataFrame, qualified_macs):
+    result = compute_cumulative_visitors(zone_positions, qualified_macs)
+    expected = _reference_cumulative(zone_positions, qualified_macs)
+
+    assert list(result.columns) == ['time_index', 'hour_decimal', 'time', 'cumulative_visitors']
+    assert len(result) == len(expected)
+    np.testing.assert_array_equal(result['time_index'].to_numpy(), expected['time_index'].to_numpy())
+    np.testing.assert_allclose(result['hour_decimal'].to_numpy(), expected['hour_decimal'].to_numpy())
+    assert result['time'].tolist() == expected['time'].tolist()
+    np.testing.assert_array_equal(result['cumulative_visitors'].to_numpy(), expected['cumulative_visitors'].to_numpy())
+
+
+def _synthetic_positions(seed: int, n_rows: int = 2000, n_macs: int = 60) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'time_index': rng.integers(1, 8641, size=n_rows),
+        'mac_address': [f'02:00:00:00:00:{i:02x}' for i in rng.integers(0, n_macs, size=n_rows)]
+    })
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_matches_loop_on_synthetic_input(seed):
+    zone_positions = _synthetic_positions(seed)
+    macs = zone_positions['mac_address'].unique()
+    _assert_matches_reference(zone_positions, macs[::2])
+
+
+def test_repeated_macs():
+    # 같은 MAC이 같은 time_index에 여러 번, 여러 time_index에 걸쳐 반복 등장
+    zone_positions = pd.DataFrame({
+        'time_index': [5, 5, 5, 7, 7, 9, 9, 9, 12, 12],
+        'mac_address': ['a', 'a', 'b', 'a', 'c', 'b', 'b', 'c', 'a', 'd']
+    })
+    _assert_matches_reference(zone_positions, ['a', 'c', 'd'])
+    _assert_matches_reference(zone_positions, ['a', 'b', 'c', 'd'])
+
+
+def test_unsorted_input_and_categorical_macs():
+    zone_positions = _synthetic_positions(3, n_rows=500, n_macs=20).sample(frac=1.0, random_state=0)
+    zone_positions['mac_address'] = zone_positions['mac_address'].astype('category')
+    qualified = zone_positions['mac_address'].cat.categories[:7]
+    _assert_matches_reference(zone_positions, qualified)
+
+
+def test_no_qualified_macs():
+    zone_positions = _synthetic_positions(4, n_rows=200)
+    result = compute_cumulative_visitors(zone_positions, [])
+    assert (result['cumulative_visitors'] == 0).all()
+    _assert_matches_reference(zone_positions, [])
+
+
+def test_empty_input():
+    empty = pd.DataFrame({'time_index': pd.Series(dtype='int64'), 'mac_address': pd.Series(dtype='object')})
+    result = compute_cumulative_visitors(empty, ['a'])
+    assert len(result) == 0
+    assert list(result.columns) == ['time_index', 'hour_decimal', 'time', 'cumulative_visitors']
+    assert len(compute_cumulative_visitors(None, [])) == 0
+
+
+def test_matches_loop_on_cached_positions():
+    positions = load_zone_positions('2025-10-12')
+    if positions is None:
+        pytest.skip('no positions cache for 2025-10-12')
+
+    zones = positions['zone'].dropna().unique()[:3]
+    zone_positions = positions[positions['zone'].isin(zones)]
+    counts = zone_positions.groupby('mac_address', observed=True).size()
+    qualified_macs = counts.index[counts >= 2]
+    _assert_matches_reference(zone_positions, qualified_macs)
+
+
+def _reference_visits(zone_positions: pd.DataFrame, gap_minutes: float = VISIT_GAP_MINUTES) -> pd.DataFrame:
+    """(mac, date)별로 정렬한 관측을 간격 기준으로 자르는 단순 루프"""
+    gap_slots = gap_minutes * 60 / SECONDS_PER_SLOT
+    keys = ['mac_address', 'date'] if 'date' in zone_positions.columns else ['mac_address']
+    frame = zone_positions.astype({key: str for key in keys})
+    visit_counts = {}
+    rows = []
+    for group, times in frame.groupby(keys)['time_index']:
+        group = group if isinstance(group, tuple) else (group,)
+        times = sorted(map(int, times))
+        start = prev = times[0]
+        samples = 1
+        for t in times[1:] + [None]:
+            if t is not None and t - prev <= gap_slots:
+                prev, samples = t, samples + 1
+                continue
+            visit = visit_counts.get(group[0], 0)
+            visit_counts[group[0]] = visit + 1
+            rows.append(dict(zip(keys, group), visit=visit, start=start, end=prev,
+                             samples=samples, dwell_minutes=(prev - start) * SECONDS_PER_SLOT / 60))
+            if t is not None:
+                start = prev = t
+                samples = 1
+    return pd.DataFrame(rows)
+
+
+def _assert_visits_match(zone_positions: pd.DataFrame, gap_minutes: float = VISIT_GAP_MINUTES):
+    result = compute_zone_visits(zone_positions, gap_minutes)
+    expected = _reference_visits(zone_positions, gap_minutes)
+    keys = ['mac_address', 'date'] if 'date' in zone_positions.columns else ['mac_address']
+
+    result = result.astype({key: str for key in keys})
+    result = result.sort_values(keys + ['start']).reset_index(drop=True)
+    expected = expected.sort_values(keys + ['start']).reset_index(drop=True)
+    # 방문 순번은 MAC 안에서 (날짜, 시작) 순서
+    expected['visit'] = expected.groupby('mac_address').cumcount()
+
+    assert len(result) == len(expected)
+    for column in keys:
+        assert result[column].tolist() == expected[column].tolist()
+    for column in ['visit', 'start', 'end', 'samples']:
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy())
+    np.testing.assert_allclose(result['dwell_minutes'].to_numpy(), expected['dwell_minutes'].to_numpy())
+
+
+def _synthetic_visits(seed: int, n_rows: int = 5000, n_macs: int = 50, n_dates: int = 2) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = _synthetic_positions(seed, n_rows, n_macs)
+    # 짧은 간격과 긴 간격이 섞이도록 좁은 시간대에 몰아서 생성
+    frame['time_index'] = rng.integers(1000, 1000 + n_rows // 2, size=n_rows)
+    frame['date'] = [f'2025-10-{d:02d}' for d in rng.integers(1, n_dates + 1, size=n_rows)]
+    return frame
+
+
+def test_zone_visits_split_on_gap():
+    # a: 10:00 부근과 18:00 부근 두 번 방문, b: 한 번 (간격 정확히 5분은 같은 방문)
+    zone_positions = pd.DataFrame({
+        'time_index': [3601, 3607, 3613, 6481, 6487, 3601, 3631],
+        'mac_address': ['a', 'a', 'a', 'a', 'a', 'b', 'b']
+    })
+    visits = compute_zone_visits(zone_positions)
+    assert list(visits.columns) == VISIT_COLUMNS
+    assert visits['mac_address'].astype(str).tolist() == ['a', 'a', 'b']
+    assert visits['visit'].tolist() == [0, 1, 0]
+    assert visits['start'].tolist() == [3601, 6481, 3601]
+    assert visits['end'].tolist() == [3613, 6487, 3631]
+    assert visits['samples'].tolist() == [3, 2, 2]
+    np.testing.assert_allclose(visits['dwell_minutes'].to_numpy(), [2.0, 1.0, 5.0])
+
+
+@pytest.mark.parametrize('categorical', [(), ('mac_address',), ('date',), ('mac_address', 'date')])
+def test_zone_visits_match_reference(categorical):
+    zone_positions = _synthetic_visits(5)
+    for column in categorical:
+        # 카테고리 순서(정렬)와 행 등장 순서가 다른 입력
+        zone_positions[column] = zone_positions[column].astype('category')
+    _assert_visits_match(zone_positions)
+    _assert_visits_match(zone_positions.drop(columns='date'), gap_minutes=2)
+
+
+def test_zone_visits_empty_input():
+    empty = pd.DataFrame({'time_index': pd.Series(dtype='int64'), 'mac_address': pd.Series(dtype='object')})
+    assert list(compute_zone_visits(empty).columns) == VISIT_COLUMNS
+    assert len(compute_zone_visits(None)) == 0
+
+
+def test_zone_visits_match_reference_on_cached_positions():
+    positions = load_zone_positions('2025-10-12')
+    if positions is None:
+        pytest.skip('no positions cache for 2025-10-12')
+
+    zones = positions['zone'].dropna().unique()[:3]
+    _assert_visits_match(positions[positions['zone'].isin(zones)][['time_index', 'mac_address']])
+
+
+def _reference_os_traffic(positions_df: pd.DataFrame, bin_minutes: int) -> pd.DataFrame:
+    slots_per_bin = bin_minutes * 60 // SECONDS_PER_SLOT
+    bins = (positions_df['time_index'].astype(int) - 1) // slots_per_bin
+    devices = positions_df.assign(bin=bins, mac_address=positions_df['mac_address'].astype(str))
+    devices = devices.drop_duplicates(['bin', 'mac_address'])
+    counts = devices.groupby(['bin', 'is_randomized_ios']).size().unstack(fill_value=0)
+    counts = counts.reindex(columns=[True, False], fill_value=0)
+    return pd.DataFrame({
+        'time_index': counts.index.to_numpy() * slots_per_bin + 1,
+        'ios': counts[True].to_numpy(),
+        'android': counts[False].to_numpy()
+    })
+
+
+@pytest.mark.parametrize('bin_minutes', [1, 5])
+def test_os_traffic_matches_reference(bin_minutes):
+    rng = np.random.default_rng(6)
+    positions_df = _synthetic_positions(6, n_rows=3000, n_macs=40)
+    # OS는 MAC마다 고정
+    ios_macs = set(positions_df['mac_address'].unique()[::3])
+    positions_df['is_randomized_ios'] = positions_df['mac_address'].isin(ios_macs)
+    positions_df = positions_df.iloc[rng.permutation(len(positions_df))]
+    positions_df['mac_address'] = positions_df['mac_address'].astype('category')
+
+    result = compute_os_traffic(positions_df, bin_minutes)
+    expected = _reference_os_traffic(positions_df, bin_minutes)
+
+    assert list(result.columns) == OS_TRAFFIC_COLUMNS
+    for column in ['time_index', 'ios', 'android']:
+        np.testing.assert_array_equal(result[column].to_numpy(), expected[column].to_numpy())
+    assert result['time'].tolist() == [time_index_to_time(t) for t in expected['time_index']]
+
+
+def test_os_traffic_empty_input():
+    assert list(compute_os_traffic(None).columns) == OS_TRAFFIC_COLUMNS